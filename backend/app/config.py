@@ -55,6 +55,7 @@ class Settings(BaseSettings):
     tile_size: int = 256
     max_zoom: int = 15
     min_zoom: int = 8
+    tiles_use_webp: bool = False  # Smaller, faster-to-encode tiles
     
     # Cache settings
     cache_ttl: int = 3600  # 1 hour
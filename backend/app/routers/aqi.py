@@ -3,7 +3,7 @@ AQI Router — Air Quality Index endpoints.
 
 Provides endpoints for AQI station data and debugging.
 """
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Response
 from typing import Dict, Any
 
 from app.dependencies import get_aqi_service
@@ -15,7 +15,7 @@ router = APIRouter()
 @router.get("/aqi/stations")
 async def get_aqi_stations(
     aqi_service: AQIService = Depends(get_aqi_service)
-) -> Dict[str, Any]:
+) -> Response:
     """
     Get AQI monitoring stations as GeoJSON.
     
@@ -23,8 +23,11 @@ async def get_aqi_stations(
     Useful for debugging and visualization of AQI station coverage.
     """
     try:
-        geojson = aqi_service.stations_to_geojson()
-        return geojson
+        # Pre-serialized, so skip FastAPI's JSON encoder
+        return Response(
+            content=aqi_service.stations_to_geojson_bytes(),
+            media_type="application/geo+json"
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -27,7 +27,7 @@ async def get_tile(
         y: Tile Y coordinate
         
     Returns:
-        PNG image tile
+        PNG image tile (WebP when tiles_use_webp is enabled)
     """
     valid_layers = ['ndvi', 'lst', 'gdi']
     
@@ -47,12 +47,12 @@ async def get_tile(
         return Response(
             content=b'',
             status_code=204,
-            headers={"Content-Type": "image/png"}
+            headers={"Content-Type": tile_service.media_type}
         )
     
     return Response(
         content=tile_bytes,
-        media_type="image/png",
+        media_type=tile_service.media_type,
         headers={
             "Cache-Control": "public, max-age=3600",
             "Access-Control-Allow-Origin": "*"
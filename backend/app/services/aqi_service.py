@@ -35,6 +35,19 @@ except ImportError:
     import urllib.request
     import json as json_module
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+    import json
+
+try:
+    from numba import njit, prange, vectorize
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
 from app.config import Settings
 
 
@@ -49,6 +62,7 @@ from app.config import Settings
 # extreme AQI values from dominating the priority score.
 AQI_NORM_MIN = 50    # Below this, no AQI penalty
 AQI_NORM_MAX = 300   # Above this, maximum AQI penalty
+_AQI_NORM_SCALE = 1.0 / (AQI_NORM_MAX - AQI_NORM_MIN)
 
 # Multi-Exposure Priority Weights (must sum to 1.0)
 # Rationale:
@@ -75,6 +89,14 @@ DELHI_BBOX = {
     "west": 76.73
 }
 
+# Looser window used to drop stray stations returned around the query box
+DELHI_STATION_BOUNDS = {
+    "north": 29.0,
+    "south": 28.3,
+    "east": 77.5,
+    "west": 76.7
+}
+
 
 # =============================================================================
 # Data Models
@@ -127,12 +149,36 @@ class AQIStationCache:
     last_updated: Optional[datetime] = None
     _lock: threading.Lock = field(default_factory=threading.Lock)
     
+    # Structure-of-arrays view of `stations` for vectorized spatial queries
+    # (NaN where a reading is missing)
+    lons: np.ndarray = field(default_factory=lambda: np.empty(0))
+    lats: np.ndarray = field(default_factory=lambda: np.empty(0))
+    aqi_raw: np.ndarray = field(default_factory=lambda: np.empty(0))
+    
     def update(self, stations: List[AQIStation]):
         """Update cached stations."""
+        n = len(stations)
+        lons = np.fromiter((s.longitude for s in stations), np.float64, n)
+        lats = np.fromiter((s.latitude for s in stations), np.float64, n)
+        aqi_raw = np.fromiter((np.nan if s.aqi_raw is None else s.aqi_raw for s in stations), np.float64, n)
+        
         with self._lock:
-            self.stations = stations
+            # Private copy, replaced wholesale and never mutated, so
+            # readers can share it without copying
+            self.stations = list(stations)
+            self.lons, self.lats, self.aqi_raw = lons, lats, aqi_raw
             self.last_updated = datetime.utcnow()
     
+    def get_arrays(self) -> Tuple[List[AQIStation], np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Get (stations, lons, lats, aqi_raw) as one consistent snapshot.
+        
+        The list and arrays are the cached objects themselves; callers
+        must treat them as read-only.
+        """
+        with self._lock:
+            return self.stations, self.lons, self.lats, self.aqi_raw
+    
     def get_stations(self) -> List[AQIStation]:
         """Get cached stations."""
         with self._lock:
@@ -171,8 +217,7 @@ def normalize_aqi(aqi_value: float) -> float:
     """
     if aqi_value is None:
         return None
-    normalized = (aqi_value - AQI_NORM_MIN) / (AQI_NORM_MAX - AQI_NORM_MIN)
-    return max(0.0, min(1.0, normalized))
+    return min(1.0, max(0.0, (aqi_value - AQI_NORM_MIN) * _AQI_NORM_SCALE))
 
 
 def haversine_distance(lon1: float, lat1: float, lon2: float, lat2: float) -> float:
@@ -195,6 +240,79 @@ def haversine_distance(lon1: float, lat1: float, lon2: float, lat2: float) -> fl
     return R * c
 
 
+if HAS_NUMBA:
+    # Explicit signatures compile at import and cache=True persists the
+    # machine code in __pycache__, so later processes skip the JIT.
+    # Scalar fast-path: no Python dispatch per call
+    haversine_distance = njit('f8(f8, f8, f8, f8)', fastmath=True, cache=True)(haversine_distance)
+    
+    def _haversine_nearest_loop(lons, lats, slons, slats):
+        n = lons.shape[0]
+        idx = np.empty(n, np.int64)
+        dist = np.empty(n, np.float64)
+        for i in prange(n):
+            best = np.inf
+            best_j = -1
+            for j in range(slons.shape[0]):
+                d = haversine_distance(lons[i], lats[i], slons[j], slats[j])
+                if d < best:
+                    best = d
+                    best_j = j
+            idx[i] = best_j
+            dist[i] = best
+        return idx, dist
+    
+    # Same loop compiled twice: threading is only worth its fork/join cost
+    # for batches (get_aqi_at_points), not for the single lookups behind
+    # get_aqi_at_point. fastmath without 'nnan'/'ninf', which would let LLVM
+    # assume the np.inf seed of the running minimum never occurs
+    _NEAREST_SIG = 'Tuple((i8[:], f8[:]))(f8[:], f8[:], f8[:], f8[:])'
+    _NEAREST_FASTMATH = {'nsz', 'arcp', 'contract', 'afn', 'reassoc'}
+    _haversine_nearest_serial = njit(
+        _NEAREST_SIG, fastmath=_NEAREST_FASTMATH, cache=True
+    )(_haversine_nearest_loop)
+    _haversine_nearest_parallel = njit(
+        _NEAREST_SIG, parallel=True, fastmath=_NEAREST_FASTMATH, cache=True
+    )(_haversine_nearest_loop)
+
+
+def haversine_nearest(
+    lons: np.ndarray,
+    lats: np.ndarray,
+    slons: np.ndarray,
+    slats: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find the nearest station for each query point in one batched pass.
+    
+    Args:
+        lons, lats: Query point coordinates
+        slons, slats: Station coordinates
+    
+    Returns:
+        (index, distance_km) arrays, one entry per query point
+    """
+    lons = np.atleast_1d(np.asarray(lons, dtype=np.float64))
+    lats = np.atleast_1d(np.asarray(lats, dtype=np.float64))
+    slons = np.asarray(slons, dtype=np.float64)
+    slats = np.asarray(slats, dtype=np.float64)
+    
+    if HAS_NUMBA:
+        if lons.shape[0] == 1:
+            return _haversine_nearest_serial(lons, lats, slons, slats)
+        return _haversine_nearest_parallel(lons, lats, slons, slats)
+    
+    # NumPy fallback: (points × stations) distance matrix
+    lat1 = np.radians(lats)[:, None]
+    lat2 = np.radians(slats)[None, :]
+    dlat = lat2 - lat1
+    dlon = np.radians(slons)[None, :] - np.radians(lons)[:, None]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    dists = 2 * 6371 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    idx = dists.argmin(axis=1)
+    return idx, dists[np.arange(len(idx)), idx]
+
+
 def compute_multi_exposure_priority(
     heat_norm: float,
     ndvi_norm: float,
@@ -235,6 +353,52 @@ def compute_multi_exposure_priority(
     return max(0.0, min(1.0, priority))
 
 
+def _priority_kernel(heat_norm, ndvi_norm, aqi_norm):
+    # Elementwise compute_multi_exposure_priority; NaN AQI plays the role
+    # of None (no reading) since arrays cannot hold None
+    green_deficit = 1.0 - ndvi_norm
+    if aqi_norm != aqi_norm:
+        priority = 0.6 * heat_norm + 0.4 * green_deficit
+    else:
+        priority = (
+            WEIGHT_HEAT * heat_norm +
+            WEIGHT_GREEN_DEFICIT * green_deficit +
+            WEIGHT_AQI * aqi_norm
+        )
+    return max(0.0, min(1.0, priority))
+
+
+if HAS_NUMBA:
+    # Compile the scalar formula into a broadcasting ufunc
+    _priority_kernel = vectorize(
+        ['f4(f4, f4, f4)', 'f8(f8, f8, f8)'], target='cpu', cache=True
+    )(_priority_kernel)
+else:
+    _priority_kernel = np.vectorize(_priority_kernel, otypes=[np.float64])
+
+
+def compute_multi_exposure_priority_array(
+    heat_norm: np.ndarray,
+    ndvi_norm: np.ndarray,
+    aqi_norm: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Vectorized compute_multi_exposure_priority over arrays of inputs.
+    
+    Args:
+        heat_norm: Normalized LST values
+        ndvi_norm: Normalized NDVI values
+        aqi_norm: Optional normalized AQI values; NaN entries (or None for
+            all of them) use the no-AQI weights
+    
+    Returns:
+        Array of priority scores in [0, 1], broadcast from the inputs
+    """
+    if aqi_norm is None:
+        aqi_norm = np.nan
+    return _priority_kernel(heat_norm, ndvi_norm, aqi_norm)
+
+
 # =============================================================================
 # AQI Service Class
 # =============================================================================
@@ -283,7 +447,7 @@ class AQIService:
         
         # Try WAQI first (free, doesn't need auth)
         try:
-            stations = self._fetch_from_waqi()
+            stations = self._filter_to_delhi_bounds(self._fetch_from_waqi())
             if stations:
                 self._cache.update(stations)
                 print(f"  ✅ Fetched {len(stations)} AQI stations from WAQI")
@@ -293,7 +457,7 @@ class AQIService:
         
         # Try OpenAQ as backup
         try:
-            stations = self._fetch_from_openaq()
+            stations = self._filter_to_delhi_bounds(self._fetch_from_openaq())
             if stations:
                 self._cache.update(stations)
                 print(f"  ✅ Fetched {len(stations)} AQI stations from OpenAQ")
@@ -307,6 +471,19 @@ class AQIService:
         self._cache.update(stations)
         return stations
     
+    def _filter_to_delhi_bounds(self, stations: List[AQIStation]) -> List[AQIStation]:
+        """Keep only stations inside DELHI_STATION_BOUNDS (one mask over the coordinate arrays)."""
+        n = len(stations)
+        lons = np.fromiter((s.longitude for s in stations), np.float64, n)
+        lats = np.fromiter((s.latitude for s in stations), np.float64, n)
+        mask = (
+            (lats > DELHI_STATION_BOUNDS["south"]) & (lats < DELHI_STATION_BOUNDS["north"]) &
+            (lons > DELHI_STATION_BOUNDS["west"]) & (lons < DELHI_STATION_BOUNDS["east"])
+        )
+        if mask.all():
+            return stations
+        return [stations[i] for i in np.flatnonzero(mask)]
+    
     def _fetch_from_waqi(self) -> List[AQIStation]:
         """Fetch stations from WAQI API (World Air Quality Index)."""
         stations = []
@@ -529,21 +706,18 @@ class AQIService:
         Returns:
             Nearest AQIStation or None if no stations available
         """
-        stations = self._cache.get_stations()
+        return self._nearest(lon, lat)[0]
+    
+    def _nearest(self, lon: float, lat: float) -> Tuple[Optional[AQIStation], Optional[float]]:
+        """Nearest station and its distance in km, or (None, None)."""
+        stations, slons, slats, _ = self._cache.get_arrays()
         
         if not stations:
-            return None
-        
-        nearest = None
-        min_dist = float('inf')
+            return None, None
         
-        for station in stations:
-            dist = haversine_distance(lon, lat, station.longitude, station.latitude)
-            if dist < min_dist:
-                min_dist = dist
-                nearest = station
+        idx, dist = haversine_nearest(lon, lat, slons, slats)
         
-        return nearest
+        return stations[idx[0]], float(dist[0])
     
     def get_aqi_at_point(self, lon: float, lat: float) -> Dict[str, Any]:
         """
@@ -556,7 +730,7 @@ class AQIService:
         Returns:
             Dict with aqi_raw, aqi_norm, station info, and distance
         """
-        station = self.get_nearest_station(lon, lat)
+        station, distance = self._nearest(lon, lat)
         
         if station is None:
             return {
@@ -566,8 +740,6 @@ class AQIService:
                 "distance_km": None
             }
         
-        distance = haversine_distance(lon, lat, station.longitude, station.latitude)
-        
         return {
             "aqi_raw": station.aqi_raw,
             "aqi_norm": station.aqi_norm,
@@ -579,17 +751,48 @@ class AQIService:
             "distance_km": round(distance, 2)
         }
     
+    def get_aqi_at_points(
+        self,
+        lons: np.ndarray,
+        lats: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Batched get_aqi_at_point: one nearest-station pass for all points.
+        
+        Args:
+            lons: Longitudes of the query points
+            lats: Latitudes of the query points
+        
+        Returns:
+            (aqi_raw, aqi_norm) float arrays, NaN where no reading is available
+        """
+        stations, slons, slats, aqi_raw = self._cache.get_arrays()
+        n = len(lons)
+        
+        if not stations or n == 0:
+            return np.full(n, np.nan), np.full(n, np.nan)
+        
+        idx, _ = haversine_nearest(lons, lats, slons, slats)
+        raw = aqi_raw[idx]
+        
+        # Same capped scaling as normalize_aqi; NaN passes through np.clip
+        norm = np.clip((raw - AQI_NORM_MIN) * _AQI_NORM_SCALE, 0.0, 1.0)
+        return raw, norm
+    
     def stations_to_geojson(self) -> Dict[str, Any]:
         """Convert stations to GeoJSON format for API response."""
-        stations = self._cache.get_stations()
+        stations, lons, lats, aqi_raw = self._cache.get_arrays()
+        
+        # Normalize all stations at once (NaN marks missing readings)
+        aqi_norm = np.clip((aqi_raw - AQI_NORM_MIN) * _AQI_NORM_SCALE, 0.0, 1.0)
+        aqi_norm = [None if math.isnan(v) else v for v in aqi_norm.tolist()]
         
-        features = []
-        for station in stations:
-            feature = {
+        features = [
+            {
                 "type": "Feature",
                 "geometry": {
                     "type": "Point",
-                    "coordinates": [station.longitude, station.latitude]
+                    "coordinates": [lon, lat]
                 },
                 "properties": {
                     "id": station.station_id,
@@ -597,12 +800,13 @@ class AQIService:
                     "pm25": station.pm25,
                     "pm10": station.pm10,
                     "aqi_raw": station.aqi_raw,
-                    "aqi_norm": station.aqi_norm,
+                    "aqi_norm": norm,
                     "source": station.source,
                     "timestamp": station.timestamp.isoformat() if station.timestamp else None
                 }
             }
-            features.append(feature)
+            for station, lon, lat, norm in zip(stations, lons.tolist(), lats.tolist(), aqi_norm)
+        ]
         
         return {
             "type": "FeatureCollection",
@@ -613,6 +817,13 @@ class AQIService:
             }
         }
     
+    def stations_to_geojson_bytes(self) -> bytes:
+        """Stations as serialized GeoJSON, encoded with orjson when available."""
+        geojson = self.stations_to_geojson()
+        if HAS_ORJSON:
+            return orjson.dumps(geojson, option=orjson.OPT_SERIALIZE_NUMPY)
+        return json.dumps(geojson).encode()
+    
     def clear_cache(self):
         """Clear the station cache."""
         self._cache.update([])
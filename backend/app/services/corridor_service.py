@@ -33,7 +33,6 @@ from pathlib import Path
 import numpy as np
 from scipy.spatial import KDTree
 from shapely.geometry import Point, LineString, MultiPoint
-from shapely.ops import unary_union
 
 from app.config import Settings
 
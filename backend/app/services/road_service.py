@@ -183,7 +183,7 @@ class RoadService:
                 - aqi_norm: Normalized AQI value [0, 1]
                 - priority_score: Multi-Exposure Priority
         """
-        from app.services.aqi_service import compute_multi_exposure_priority, normalize_aqi
+        from app.services.aqi_service import compute_multi_exposure_priority_array
         
         roads = self.sample_gdi_along_roads(raster_service)
         
@@ -202,19 +202,18 @@ class RoadService:
         # Initialize new columns
         heat_norms = []
         ndvi_norms = []
-        aqi_raws = []
-        aqi_norms = []
-        priority_scores = []
+        centroid_x = np.empty(len(roads))
+        centroid_y = np.empty(len(roads))
         
         h, w = ndvi.shape if ndvi is not None else (0, 0)
         
         from rasterio.transform import rowcol
         
-        for idx, row in roads.iterrows():
-            geom = row.geometry
-            
+        for i, geom in enumerate(roads.geometry):
             # Get centroid for AQI lookup
             centroid = geom.centroid
+            centroid_x[i] = centroid.x
+            centroid_y[i] = centroid.y
             
             # Sample heat and NDVI at centroid
             heat_norm = None
@@ -237,29 +236,33 @@ class RoadService:
                 except Exception:
                     pass
             
-            # Get AQI from nearest station
-            aqi_info = aqi_service.get_aqi_at_point(centroid.x, centroid.y)
-            aqi_raw = aqi_info.get("aqi_raw")
-            aqi_norm = aqi_info.get("aqi_norm")
-            
-            # Compute multi-exposure priority
-            if heat_norm is not None and ndvi_norm is not None:
-                priority = compute_multi_exposure_priority(heat_norm, ndvi_norm, aqi_norm)
-            else:
-                priority = row.get('gdi_mean')  # Fallback to existing GDI
-            
             heat_norms.append(heat_norm)
             ndvi_norms.append(ndvi_norm)
-            aqi_raws.append(aqi_raw)
-            aqi_norms.append(aqi_norm)
-            priority_scores.append(priority)
+        
+        # Get AQI from the nearest station for all centroids in one pass
+        aqi_raw_arr, aqi_arr = aqi_service.get_aqi_at_points(centroid_x, centroid_y)
+        
+        # Compute multi-exposure priority for all segments in one pass
+        # (None becomes NaN; NaN AQI selects the no-AQI weights)
+        heat_arr = np.array(heat_norms, dtype=np.float64)
+        ndvi_arr = np.array(ndvi_norms, dtype=np.float64)
+        has_components = np.isfinite(heat_arr) & np.isfinite(ndvi_arr)
+        
+        # Fallback to existing GDI where heat/NDVI could not be sampled
+        if 'gdi_mean' in roads:
+            priority_scores = roads['gdi_mean'].to_numpy(dtype=np.float64, copy=True)
+        else:
+            priority_scores = np.full(len(roads), np.nan)
+        priority_scores[has_components] = compute_multi_exposure_priority_array(
+            heat_arr[has_components], ndvi_arr[has_components], aqi_arr[has_components]
+        )
         
         # Add new columns
         roads = roads.copy()
         roads['heat_norm'] = heat_norms
         roads['ndvi_norm'] = ndvi_norms
-        roads['aqi_raw'] = aqi_raws
-        roads['aqi_norm'] = aqi_norms
+        roads['aqi_raw'] = aqi_raw_arr
+        roads['aqi_norm'] = aqi_arr
         roads['priority_score'] = priority_scores
         
         print(f"  ✅ Computed multi-exposure priority for {len(roads)} road segments")
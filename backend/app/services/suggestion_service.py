@@ -11,11 +11,15 @@ DATA MODEL (MongoDB collection: corridor_suggestions):
     "_id": "ObjectId",
     "corridor_id": "string",
     "text": "string",
-    "upvotes": 0,
-    "created_at": "ISO-8601",
-    "client_ip": "string"  # For rate limiting only
+    "upvotes": 0
 }
 
+created_at is derived from the ObjectId's embedded timestamp; documents
+written by older versions may still carry a stored created_at, which wins
+(for display and for ordering) until scripts/migrate_suggestions.py has
+folded it into the _id. Client IPs
+are never persisted; rate-limit state lives in RateLimiter.
+
 DESIGN PRINCIPLES:
 - No authentication required
 - Simple IP-based rate limiting
@@ -23,18 +27,78 @@ DESIGN PRINCIPLES:
 """
 
 import os
-from datetime import datetime, timedelta
+import re
+import heapq
+from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict, Any, List
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 import threading
 
 from bson import ObjectId
-from pymongo import MongoClient, DESCENDING, ASCENDING
-from pymongo.errors import ConnectionFailure
+from cachetools import TTLCache
+from pymongo import MongoClient, DESCENDING, ASCENDING, UpdateOne
+from pymongo.errors import ConnectionFailure, PyMongoError
 
 from app.config import Settings
 
 
+# Any single character repeated 16+ times in a row ("!!!!!!!!...", "aaaa...")
+_SPAM_REPEAT = re.compile(r'(.)\1{15,}')
+
+
+def _available_compressors() -> str:
+    """
+    Wire compressors to negotiate with the server, best first.
+    
+    zstd and snappy need optional packages; zlib ships with Python.
+    """
+    compressors = []
+    try:
+        import zstandard  # noqa: F401
+        compressors.append("zstd")
+    except ImportError:
+        pass
+    try:
+        import snappy  # noqa: F401
+        compressors.append("snappy")
+    except ImportError:
+        pass
+    compressors.append("zlib")
+    return ",".join(compressors)
+
+
+def _created_time(doc: Dict[str, Any]) -> datetime:
+    """
+    Creation time of a suggestion document as a naive UTC datetime.
+    
+    Prefers a legacy stored created_at (which may be backdated) and falls
+    back to the ObjectId's embedded timestamp.
+    """
+    stored = doc.get("created_at")
+    if stored:
+        try:
+            dt = stored if isinstance(stored, datetime) else datetime.fromisoformat(stored)
+        except (TypeError, ValueError):
+            dt = None
+        if dt is not None:
+            return dt.astimezone(timezone.utc).replace(tzinfo=None) if dt.tzinfo else dt
+    return doc["_id"].generation_time.replace(tzinfo=None)
+
+
+def _created_at(doc: Dict[str, Any]) -> str:
+    """
+    ISO-8601 creation time of a suggestion document.
+    
+    Legacy stored values are returned verbatim; derived ones use the same
+    naive UTC format older versions stored (datetime.utcnow().isoformat()).
+    """
+    stored = doc.get("created_at")
+    if isinstance(stored, str) and stored:
+        return stored
+    return _created_time(doc).isoformat()
+
+
 class RateLimiter:
     """
     Simple in-memory rate limiter for IP-based throttling.
@@ -111,19 +175,54 @@ class SuggestionService:
     Uses MongoDB for persistence with in-memory rate limiting.
     """
     
-    # Collection name
+    # Collection names
     COLLECTION_NAME = "corridor_suggestions"
+    STATS_COLLECTION_NAME = "corridor_stats"
+    
+    # Connection pool settings
+    # A warm minimum avoids paying TCP + handshake latency on the first burst
+    # of concurrent requests; idle connections are recycled after 5 minutes.
+    POOL_MAX_SIZE = 50
+    POOL_MIN_SIZE = 5
+    POOL_MAX_IDLE_MS = 300_000
+    
+    # Documents fetched per round-trip when streaming suggestion lists
+    CURSOR_BATCH_SIZE = 200
+    
+    # Micro-cache for read paths hit on every list/tile render; entries
+    # are dropped on writes, so the TTL only bounds cross-process staleness
+    READ_CACHE_TTL = 5  # seconds
+    
+    # Compound index that serves the ranked listing (filter + sort)
+    RANKED_INDEX = [
+        ("corridor_id", ASCENDING),
+        ("upvotes", DESCENDING),
+        ("_id", ASCENDING)  # ObjectIds sort by creation time
+    ]
     
     def __init__(self, settings: Settings):
         self.settings = settings
         self._client: Optional[MongoClient] = None
         self._db = None
         self._collection = None
+        self._stats_collection = None
         self._connected = False
         
         # Rate limiter instance
         self.rate_limiter = RateLimiter()
         
+        # Short-lived read caches keyed by corridor_id
+        self._list_cache = TTLCache(maxsize=1024, ttl=self.READ_CACHE_TTL)
+        self._count_cache = TTLCache(maxsize=2048, ttl=self.READ_CACHE_TTL)
+        self._cache_lock = threading.Lock()
+        # Bumped on every invalidation; a read only fills the cache if no
+        # write landed while its query was in flight
+        self._cache_generation = 0
+        
+        # Whether any document still stores created_at (not yet migrated);
+        # new writes never add it, so this is only checked on connect
+        self._has_legacy_created_at = False
+        
         # Connect to MongoDB
         self._connect()
     
@@ -133,21 +232,31 @@ class SuggestionService:
         db_name = os.environ.get("MONGODB_DB", "urban_green_corridors")
         
         try:
-            self._client = MongoClient(mongo_uri, serverSelectionTimeoutMS=5000)
+            self._client = MongoClient(
+                mongo_uri,
+                serverSelectionTimeoutMS=5000,
+                maxPoolSize=self.POOL_MAX_SIZE,
+                minPoolSize=self.POOL_MIN_SIZE,
+                maxIdleTimeMS=self.POOL_MAX_IDLE_MS,
+                retryWrites=True,
+                w=1,
+                compressors=_available_compressors(),
+            )
             # Test connection
             self._client.admin.command('ping')
+            self.warmup()
             
             self._db = self._client[db_name]
             self._collection = self._db[self.COLLECTION_NAME]
+            self._stats_collection = self._db[self.STATS_COLLECTION_NAME]
             
             # Create indexes
             self._collection.create_index("corridor_id")
-            self._collection.create_index("created_at")
-            self._collection.create_index([
-                ("corridor_id", ASCENDING),
-                ("upvotes", DESCENDING),
-                ("created_at", ASCENDING)
-            ])
+            self._collection.create_index(self.RANKED_INDEX)
+            self._backfill_corridor_stats()
+            self._has_legacy_created_at = self._collection.find_one(
+                {"created_at": {"$exists": True}}, {"_id": 1}
+            ) is not None
             
             self._connected = True
             print(f"✅ Connected to MongoDB: {db_name}/{self.COLLECTION_NAME}")
@@ -157,6 +266,64 @@ class SuggestionService:
             print("   Suggestion feature will be unavailable")
             self._connected = False
     
+    def warmup(self, connections: Optional[int] = None):
+        """
+        Fill the connection pool by issuing parallel pings.
+        
+        Each concurrent ping checks out its own socket, so the pool holds
+        `connections` established connections once this returns.
+        """
+        if self._client is None:
+            return
+        
+        count = connections or self.POOL_MIN_SIZE
+        with ThreadPoolExecutor(max_workers=count) as pool:
+            list(pool.map(lambda _: self._client.admin.command('ping'), range(count)))
+    
+    def _ranked_cursor(self, corridor_id: str, projection: Dict[str, int]):
+        """Cursor over a corridor's suggestions, pinned to RANKED_INDEX."""
+        return self._collection.find(
+            {"corridor_id": corridor_id},
+            projection=projection
+        ).sort([
+            ("upvotes", DESCENDING),
+            ("_id", ASCENDING)
+        ]).hint(self.RANKED_INDEX)
+    
+    def _backfill_corridor_stats(self):
+        """
+        Seed per-corridor upvote totals from existing suggestions.
+        
+        corridor_stats is maintained incrementally by upvote_suggestion;
+        this only runs when the collection is empty (first start, or after
+        the stats were dropped) so totals for pre-existing data are correct.
+        """
+        if self._stats_collection.estimated_document_count() > 0:
+            return
+        
+        totals = self._collection.aggregate([
+            {"$group": {"_id": "$corridor_id", "total_upvotes": {"$sum": "$upvotes"}}}
+        ])
+        # $setOnInsert only seeds corridors that have no stats document yet:
+        # an upvote's $inc that landed after the aggregation is never
+        # overwritten, and a second process backfilling concurrently is a no-op
+        ops = [
+            UpdateOne(
+                {"_id": doc["_id"]},
+                {"$setOnInsert": {"total_upvotes": doc["total_upvotes"]}},
+                upsert=True
+            )
+            for doc in totals if doc["_id"] is not None
+        ]
+        if not ops:
+            return
+        
+        try:
+            self._stats_collection.bulk_write(ops, ordered=False)
+            print(f"   Backfilled upvote totals for {len(ops)} corridors")
+        except PyMongoError as e:
+            print(f"⚠️ Corridor upvote backfill failed: {e}")
+    
     @property
     def is_connected(self) -> bool:
         """Check if MongoDB connection is active."""
@@ -208,38 +375,45 @@ class SuggestionService:
         doc = {
             "corridor_id": corridor_id,
             "text": text,
-            "upvotes": 0,
-            "created_at": datetime.utcnow().isoformat(),
-            "client_ip": client_ip  # Stored for rate limiting, not displayed
+            "upvotes": 0
         }
         
         result = self._collection.insert_one(doc)
-        doc["_id"] = str(result.inserted_id)
         
         # Record for rate limiting
         self.rate_limiter.record_suggestion(client_ip, corridor_id)
         
-        # Return without client_ip
+        with self._cache_lock:
+            self._cache_generation += 1
+            self._list_cache.pop(corridor_id, None)
+            self._count_cache.pop(corridor_id, None)
+        
         return {
-            "id": doc["_id"],
+            "id": str(result.inserted_id),
             "corridor_id": doc["corridor_id"],
             "text": doc["text"],
             "upvotes": doc["upvotes"],
-            "created_at": doc["created_at"]
+            "created_at": _created_at(doc)
         }
     
     def _is_spam(self, text: str) -> bool:
         """Basic spam detection."""
-        # Check for repetitive characters
-        if len(set(text.lower())) < 3:
-            return True
-        
         # Check for all caps (if long enough)
         if len(text) > 20 and text.isupper():
             return True
         
+        # Check for long runs of one character
+        if _SPAM_REPEAT.search(text):
+            return True
+        
+        low = text.lower()
+        
+        # Check for repetitive characters
+        if len(set(low)) < 3:
+            return True
+        
         # Check for excessive repetition
-        words = text.lower().split()
+        words = low.split()
         if len(words) > 3 and len(set(words)) == 1:
             return True
         
@@ -262,21 +436,38 @@ class SuggestionService:
         if not self.is_connected:
             return []
         
-        cursor = self._collection.find(
-            {"corridor_id": corridor_id}
-        ).sort([
-            ("upvotes", DESCENDING),
-            ("created_at", ASCENDING)
-        ])
-        
-        suggestions = []
-        for doc in cursor:
-            suggestions.append({
+        with self._cache_lock:
+            cached = self._list_cache.get(corridor_id)
+            generation = self._cache_generation
+        if cached is not None:
+            # Callers may mutate the result; never hand out the cached dicts
+            return [dict(s) for s in cached]
+        
+        # corridor_id is already known, so keep it off the wire
+        cursor = self._ranked_cursor(
+            corridor_id,
+            {"corridor_id": 0}
+        ).batch_size(self.CURSOR_BATCH_SIZE)
+        
+        docs = list(cursor)
+        if any("created_at" in doc for doc in docs):
+            # Unmigrated documents: the index breaks upvote ties on _id, but
+            # the displayed (possibly backdated) created_at must decide
+            docs.sort(key=lambda doc: (-doc.get("upvotes", 0), _created_time(doc)))
+        
+        suggestions = [
+            {
                 "id": str(doc["_id"]),
                 "text": doc["text"],
                 "upvotes": doc.get("upvotes", 0),
-                "created_at": doc["created_at"]
-            })
+                "created_at": _created_at(doc)
+            }
+            for doc in docs
+        ]
+        
+        with self._cache_lock:
+            if generation == self._cache_generation:
+                self._list_cache[corridor_id] = [dict(s) for s in suggestions]
         
         return suggestions
     
@@ -322,33 +513,61 @@ class SuggestionService:
         if result is None:
             raise ValueError("Suggestion not found")
         
+        # Keep the per-corridor total in step so reads stay O(1). The
+        # suggestion upvote already landed, so a failure here must not turn
+        # into an error response. Dropping corridor_stats rebuilds the totals
+        # on the next start if they drift
+        try:
+            self._stats_collection.update_one(
+                {"_id": result["corridor_id"]},
+                {"$inc": {"total_upvotes": 1}},
+                upsert=True
+            )
+        except PyMongoError as e:
+            print(f"⚠️ Failed to update upvote total for {result['corridor_id']}: {e}")
+        
         # Record for rate limiting
         self.rate_limiter.record_upvote(client_ip)
         
+        # Ranking changed; counts did not
+        with self._cache_lock:
+            self._cache_generation += 1
+            self._list_cache.pop(result["corridor_id"], None)
+        
         return {
             "id": str(result["_id"]),
             "text": result["text"],
             "upvotes": result.get("upvotes", 0),
-            "created_at": result["created_at"]
+            "created_at": _created_at(result)
         }
     
     def get_suggestion_count(self, corridor_id: str) -> int:
         """Get count of suggestions for a corridor."""
         if not self.is_connected:
             return 0
-        return self._collection.count_documents({"corridor_id": corridor_id})
+        
+        with self._cache_lock:
+            cached = self._count_cache.get(corridor_id)
+            generation = self._cache_generation
+        if cached is not None:
+            return cached
+        
+        count = self._collection.count_documents({"corridor_id": corridor_id})
+        with self._cache_lock:
+            if generation == self._cache_generation:
+                self._count_cache[corridor_id] = count
+        return count
     
     def get_total_upvotes(self, corridor_id: str) -> int:
         """Get total upvotes across all suggestions for a corridor."""
         if not self.is_connected:
             return 0
         
-        pipeline = [
-            {"$match": {"corridor_id": corridor_id}},
-            {"$group": {"_id": None, "total": {"$sum": "$upvotes"}}}
-        ]
-        result = list(self._collection.aggregate(pipeline))
-        return result[0]["total"] if result else 0
+        doc = self._stats_collection.find_one(
+            {"_id": corridor_id},
+            {"total_upvotes": 1}
+        )
+        return doc.get("total_upvotes", 0) if doc else 0
 
     def upvote_corridor(self, corridor_id: str, client_ip: str) -> Dict[str, Any]:
         """
@@ -406,19 +625,29 @@ class SuggestionService:
             return []
         
         try:
-            cursor = self._collection.find(
-                {},
-                {"_id": 1, "corridor_id": 1, "text": 1, "upvotes": 1, "created_at": 1}
-            ).sort("created_at", -1).limit(200)
+            projection = {"_id": 1, "corridor_id": 1, "text": 1, "upvotes": 1, "created_at": 1}
+            
+            if self._has_legacy_created_at:
+                # Unmigrated documents sort by their stored created_at, which
+                # may not match their _id; merge them with the newest others
+                legacy = self._collection.find({"created_at": {"$exists": True}}, projection)
+                newest = self._collection.find(
+                    {"created_at": {"$exists": False}}, projection
+                ).sort("_id", -1).limit(200)
+                docs = heapq.nlargest(
+                    200, [*legacy, *newest], key=lambda doc: (_created_time(doc), doc["_id"])
+                )
+            else:
+                docs = self._collection.find({}, projection).sort("_id", -1).limit(200)
             
             results = []
-            for doc in cursor:
+            for doc in docs:
                 results.append({
                     "id": str(doc["_id"]),
                     "corridor_id": doc.get("corridor_id", ""),
                     "text": doc.get("text", ""),
                     "upvotes": doc.get("upvotes", 0),
-                    "created_at": doc.get("created_at", ""),
+                    "created_at": _created_at(doc),
                 })
             return results
         except Exception:
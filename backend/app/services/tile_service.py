@@ -6,14 +6,36 @@ Converts raster arrays to PNG tiles for Leaflet consumption.
 import numpy as np
 from PIL import Image
 import io
+import math
+from functools import lru_cache
 from typing import Tuple, Optional
-from cachetools import TTLCache
+from cachetools import LRUCache
+import threading
 import matplotlib.pyplot as plt
 import matplotlib.colors as mcolors
 
+try:
+    import cv2
+    HAS_CV2 = True
+except ImportError:
+    HAS_CV2 = False
+
+try:
+    import numexpr as ne
+    HAS_NUMEXPR = True
+except ImportError:
+    HAS_NUMEXPR = False
+
 from app.services.raster_service import RasterService
 
 
+@lru_cache(maxsize=4096)
+def _lat_for(z: int, y: int) -> float:
+    """Latitude of the northern edge of tile row `y` at zoom `z` (Web Mercator)."""
+    n = 2 ** z
+    return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+
+
 class TileService:
     """Service for generating XYZ map tiles from raster data."""
     
@@ -32,10 +54,23 @@ class TileService:
         'gdi': (0, 1),  # Will be overridden with actual data percentiles
     }
     
+    # LUT row reserved for NaN/NoData (fully transparent)
+    NODATA_INDEX = 256
+    
+    # Cached marker for tiles known to contain no data, so repeated requests
+    # for off-raster tiles are a single cache hit
+    _EMPTY_TILE = object()
+    
     def __init__(self, raster_service: RasterService, tile_size: int = 256):
         self.raster_service = raster_service
         self.tile_size = tile_size
-        self._cache = TTLCache(maxsize=1000, ttl=3600)
+        # Rendered tiles only change when the rasters are reloaded (which
+        # clears the cache), so evict by recency rather than age
+        self._cache = LRUCache(maxsize=4096)
+        self._cache_lock = threading.Lock()  # LRU reorders on every read
+        
+        # Tile encoding (Leaflet handles both)
+        self._format = 'WEBP' if raster_service.settings.tiles_use_webp else 'PNG'
         
         # Create custom GDI colormap (Green → Yellow-Green → Yellow → Orange → Red)
         # 5-stop colormap gives better visual differentiation
@@ -66,10 +101,61 @@ class TileService:
                             float(np.percentile(valid_lst, 98))
                         )
                         print(f"  🎨 LST tile range set to [{self.VALUE_RANGES['lst'][0]:.3f}, {self.VALUE_RANGES['lst'][1]:.3f}]")
+        
+        # Precompute an RGBA lookup table per layer so tile rendering is a
+        # single gather instead of a matplotlib colormap call
+        self._luts = {layer: self._build_lut(layer) for layer in self.COLORMAPS}
+    
+    def _get_cmap(self, layer: str):
+        """Get the matplotlib colormap for a layer."""
+        if layer == 'gdi':
+            return self._gdi_cmap
+        return plt.get_cmap(self.COLORMAPS.get(layer, 'viridis'))
+    
+    def _build_lut(self, layer: str) -> np.ndarray:
+        """
+        Build a (257, 4) uint8 RGBA lookup table for a layer's colormap.
+        
+        Rows 0-255 are the colour bins; row NODATA_INDEX is transparent.
+        """
+        cmap = self._get_cmap(layer)
+        lut = np.zeros((self.NODATA_INDEX + 1, 4), dtype=np.uint8)
+        lut[:256] = (cmap(np.linspace(0, 1, 256)) * 255).astype(np.uint8)
+        return lut
+    
+    def _quantize(self, data: np.ndarray, vmin: float, vmax: float) -> np.ndarray:
+        """
+        Map raw values to LUT indices in one fused pass.
+        
+        Values are clamped into the same 256 bins matplotlib uses and NaN
+        maps to NODATA_INDEX, so no separate mask array is needed.
+        """
+        scale = np.float32(256.0 / (vmax - vmin + 1e-8))
+        lo = np.float32(vmin)
+        
+        if HAS_NUMEXPR:
+            hi = np.float32(vmin + 255.0 / scale)
+            idx = ne.evaluate(
+                "where(data == data,"
+                " where(data < lo, 0, where(data > hi, 255, (data - lo) * scale)),"
+                " 256)"
+            )
+        else:
+            idx = np.subtract(data, lo, dtype=np.float32)
+            idx *= scale
+            np.clip(idx, 0, 255, out=idx)
+            idx[np.isnan(idx)] = self.NODATA_INDEX
+        
+        return idx.astype(np.uint16)
+    
+    @property
+    def media_type(self) -> str:
+        """MIME type of the tiles returned by get_tile."""
+        return 'image/webp' if self._format == 'WEBP' else 'image/png'
     
     def get_tile(self, layer: str, z: int, x: int, y: int) -> Optional[bytes]:
         """
-        Generate a PNG tile for the specified layer and tile coordinates.
+        Generate an image tile for the specified layer and tile coordinates.
         
         Args:
             layer: Layer name (ndvi, lst, gdi)
@@ -78,20 +164,28 @@ class TileService:
             y: Tile Y coordinate
             
         Returns:
-            PNG image bytes or None if tile is outside bounds
+            PNG (or WebP, see media_type) image bytes or None if tile is
+            outside bounds
         """
-        cache_key = f"{layer}_{z}_{x}_{y}"
+        cache_key = (layer, z, x, y)
         
         # Check cache
-        if cache_key in self._cache:
-            return self._cache[cache_key]
+        with self._cache_lock:
+            cached = self._cache.get(cache_key)
+        if cached is self._EMPTY_TILE:
+            return None
+        if cached is not None:
+            return cached
         
         # Get tile bounds in geographic coordinates
         tile_bounds = self._tile_to_bounds(z, x, y)
         
         # Check if tile intersects our data bounds
         data_bounds = self.raster_service.bounds
-        if not self._bounds_intersect(tile_bounds, data_bounds):
+        tw, ts, te, tn = tile_bounds
+        dw, ds, de, dn = data_bounds
+        if te < dw or de < tw or tn < ds or dn < ts:
+            self._store(cache_key, self._EMPTY_TILE)
             return None
         
         # Get layer data
@@ -101,17 +195,23 @@ class TileService:
         
         # Extract tile data from raster
         tile_data = self._extract_tile_data(data, tile_bounds, data_bounds)
-        if tile_data is None:
+        if tile_data is None or not np.isfinite(tile_data).any():
+            self._store(cache_key, self._EMPTY_TILE)
             return None
         
         # Convert to image
         img_bytes = self._data_to_png(tile_data, layer)
         
         # Cache result
-        self._cache[cache_key] = img_bytes
+        self._store(cache_key, img_bytes)
         
         return img_bytes
     
+    def _store(self, cache_key: Tuple, value) -> None:
+        """Insert a rendered tile (or the empty marker) into the cache."""
+        with self._cache_lock:
+            self._cache[cache_key] = value
+    
     def _tile_to_bounds(self, z: int, x: int, y: int) -> Tuple[float, float, float, float]:
         """Convert tile coordinates to geographic bounds (west, south, east, north)."""
         n = 2 ** z
@@ -119,18 +219,12 @@ class TileService:
         west = x / n * 360.0 - 180.0
         east = (x + 1) / n * 360.0 - 180.0
         
-        north = np.arctan(np.sinh(np.pi * (1 - 2 * y / n))) * 180.0 / np.pi
-        south = np.arctan(np.sinh(np.pi * (1 - 2 * (y + 1) / n))) * 180.0 / np.pi
+        # Scalar math; rows depend only on (z, y) so latitudes are cached
+        north = _lat_for(z, y)
+        south = _lat_for(z, y + 1)
         
         return (west, south, east, north)
     
-    def _bounds_intersect(self, bounds1: Tuple, bounds2: Tuple) -> bool:
-        """Check if two bounding boxes intersect."""
-        w1, s1, e1, n1 = bounds1
-        w2, s2, e2, n2 = bounds2
-        
-        return not (e1 < w2 or e2 < w1 or n1 < s2 or n2 < s1)
-    
     def _extract_tile_data(
         self, 
         data: np.ndarray, 
@@ -168,6 +262,19 @@ class TileService:
         if subset.size == 0:
             return None
         
+        if HAS_CV2:
+            # OpenCV's resize is SIMD-vectorized and avoids PIL's float-image
+            # round trip. Area averaging when shrinking keeps the anti-aliasing
+            # PIL's BILINEAR filter gave us at low zoom.
+            interpolation = (
+                cv2.INTER_AREA if max(subset.shape) > self.tile_size else cv2.INTER_LINEAR
+            )
+            return cv2.resize(
+                np.ascontiguousarray(subset, dtype=np.float32),
+                (self.tile_size, self.tile_size),
+                interpolation=interpolation
+            )
+        
         # Resize to tile size using PIL for better quality
         img = Image.fromarray(subset.astype(np.float32), mode='F')
         img = img.resize((self.tile_size, self.tile_size), Image.Resampling.BILINEAR)
@@ -175,41 +282,33 @@ class TileService:
         return np.array(img)
     
     def _data_to_png(self, data: np.ndarray, layer: str) -> bytes:
-        """Convert normalized data array to PNG bytes."""
+        """Convert normalized data array to PNG (or WebP) bytes."""
         # Get value range
         vmin, vmax = self.VALUE_RANGES.get(layer, (0, 1))
         
-        # Normalize data
-        normalized = (data - vmin) / (vmax - vmin + 1e-8)
-        normalized = np.clip(normalized, 0, 1)
-        
-        # Handle NaN values
-        mask = ~np.isfinite(data)
-        
-        # Get colormap
-        if layer == 'gdi':
-            cmap = self._gdi_cmap
-        else:
-            cmap = plt.get_cmap(self.COLORMAPS.get(layer, 'viridis'))
-        
-        # Apply colormap
-        rgba = cmap(normalized)
+        lut = self._luts.get(layer)
+        if lut is None:
+            lut = self._luts.setdefault(layer, self._build_lut(layer))
         
-        # Set transparent for NaN/NoData
-        rgba[mask] = [0, 0, 0, 0]
-        
-        # Convert to 8-bit RGBA
-        rgba_uint8 = (rgba * 255).astype(np.uint8)
+        # Apply colormap as a single gather; NaN/NoData lands on the
+        # transparent row
+        rgba_uint8 = lut[self._quantize(data, vmin, vmax)]
         
         # Create PNG
         img = Image.fromarray(rgba_uint8, mode='RGBA')
         
+        # Favour encode speed: tiles are cached and re-rendered on every miss,
+        # so zlib level 1 beats optimize=True's multi-pass level 9
         buffer = io.BytesIO()
-        img.save(buffer, format='PNG', optimize=True)
+        if self._format == 'WEBP':
+            img.save(buffer, format='WEBP', quality=80, method=0)
+        else:
+            img.save(buffer, format='PNG', compress_level=1)
         buffer.seek(0)
         
         return buffer.getvalue()
     
     def clear_cache(self):
         """Clear the tile cache."""
-        self._cache.clear()
+        with self._cache_lock:
+            self._cache.clear()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Migrate Suggestions — One-off cleanup of corridor_suggestions written by
+older backend versions.
+
+Usage:
+    python scripts/migrate_suggestions.py
+
+This script:
+1. Removes the client_ip field (rate limiting is in-memory only, so it was
+   never read back)
+2. Re-keys suggestions whose stored created_at disagrees with their _id
+   timestamp (e.g. backdated seed data), then drops created_at, which the
+   API now derives from the _id
+3. Drops the indexes that were built on created_at
+
+It is safe to re-run; documents that are already clean are left untouched.
+"""
+
+import os
+from datetime import datetime, timezone
+
+from bson import ObjectId
+from pymongo import MongoClient, InsertOne, DeleteOne
+
+# Indexes created by versions that sorted on the stored created_at
+LEGACY_INDEXES = ["created_at_1", "corridor_id_1_upvotes_-1_created_at_1"]
+
+
+def strip_client_ips(collection) -> int:
+    """Unset client_ip on every suggestion that still carries it."""
+    result = collection.update_many(
+        {"client_ip": {"$exists": True}},
+        {"$unset": {"client_ip": ""}}
+    )
+    return result.modified_count
+
+
+def _parse_created_at(value) -> datetime | None:
+    """Stored created_at as an aware UTC datetime (naive values are UTC)."""
+    if isinstance(value, datetime):
+        dt = value
+    else:
+        try:
+            dt = datetime.fromisoformat(str(value))
+        except ValueError:
+            return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def rekey_backdated(collection) -> int:
+    """
+    Give every suggestion whose stored created_at is not the _id timestamp
+    a new ObjectId carrying that time, so ordering and the derived
+    created_at survive dropping the field.
+
+    Each document is re-inserted before its old copy is deleted, in one
+    ordered bulk write, so an interruption can at worst leave a duplicate.
+    """
+    ops = []
+    for doc in collection.find({"created_at": {"$exists": True}}):
+        created = _parse_created_at(doc["created_at"])
+        if created is None:
+            continue
+        stamp = int(created.timestamp())
+        if stamp == int(doc["_id"].generation_time.timestamp()):
+            continue
+
+        new_doc = dict(doc, _id=ObjectId(stamp.to_bytes(4, "big") + os.urandom(8)))
+        ops += [InsertOne(new_doc), DeleteOne({"_id": doc["_id"]})]
+
+    if ops:
+        collection.bulk_write(ops, ordered=True)
+    return len(ops) // 2
+
+
+def strip_created_at(collection) -> int:
+    """Unset created_at once every _id carries the creation time."""
+    result = collection.update_many(
+        {"created_at": {"$exists": True}},
+        {"$unset": {"created_at": ""}}
+    )
+    return result.modified_count
+
+
+def drop_legacy_indexes(collection) -> list[str]:
+    """Drop the created_at indexes that no query uses any more."""
+    existing = collection.index_information()
+    dropped = [name for name in LEGACY_INDEXES if name in existing]
+    for name in dropped:
+        collection.drop_index(name)
+    return dropped
+
+
+def main():
+    print("=" * 60)
+    print("🌱 VanSetu — Migrate Community Suggestions")
+    print("=" * 60)
+
+    # ── 1. Connect to MongoDB ──
+    mongo_uri = os.environ.get("MONGODB_URI", "mongodb://localhost:27017")
+    db_name = os.environ.get("MONGODB_DB", "urban_green_corridors")
+    client = MongoClient(mongo_uri, serverSelectionTimeoutMS=5000)
+    client.admin.command("ping")
+    collection = client[db_name]["corridor_suggestions"]
+
+    print(f"\n✅ Connected to MongoDB: {db_name}/corridor_suggestions")
+
+    # ── 2. Strip legacy fields ──
+    stripped = strip_client_ips(collection)
+    print(f"🧹 Removed client_ip from {stripped} suggestions")
+
+    # ── 3. Fold created_at into the _id ──
+    rekeyed = rekey_backdated(collection)
+    print(f"🔑 Re-keyed {rekeyed} backdated suggestions")
+    stripped = strip_created_at(collection)
+    print(f"🧹 Removed created_at from {stripped} suggestions")
+
+    # ── 4. Drop obsolete indexes ──
+    for name in drop_legacy_indexes(collection):
+        print(f"🗑️  Dropped index {name}")
+
+    print("\n🎉 Done!")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,17 +10,20 @@ This script:
 2. Empties the corridor_suggestions collection
 3. Inserts diverse, context-aware dummy suggestions based on each corridor's
    type, severity, and intervention recommendations
+4. Rebuilds the corridor_stats upvote totals to match
 """
 
 import os
 import sys
-import random
+import time
 import hashlib
-from datetime import datetime, timedelta
+
+import numpy as np
 
 # ── Make backend importable ──
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from bson import ObjectId
 from pymongo import MongoClient
 from app.config import get_settings
 from app.services.raster_service import RasterService
@@ -107,50 +110,72 @@ GENERIC_SUGGESTIONS = [
     "Heritage trees near {name} should be GPS-tagged and protected.",
 ]
 
-# Fake IP addresses for realistic seeding
-FAKE_IPS = [
-    "192.168.1.10", "192.168.1.23", "10.0.0.55", "172.16.0.8",
-    "192.168.2.101", "10.0.1.42", "172.16.1.200", "192.168.3.77",
-    "10.0.2.15", "172.16.2.33", "192.168.4.60", "10.0.3.88",
-    "192.168.5.122", "172.16.3.91", "10.0.4.7", "192.168.6.210",
-]
+# Upvote distribution for seeded suggestions
+UPVOTE_VALUES = np.array([0, 1, 2, 3, 5, 8, 13, 21])
+UPVOTE_WEIGHTS = np.array([10, 15, 20, 20, 15, 10, 7, 3], dtype=float)
+
 
+def _random_past_ids(rng: np.random.Generator, size: int, days_back: int = 90) -> list[ObjectId]:
+    """
+    Generate `size` ObjectIds with random creation times within the last N days.
 
-def _random_past_datetime(days_back: int = 90) -> str:
-    """Generate a random ISO datetime within the last N days."""
-    offset = random.randint(0, days_back * 24 * 3600)
-    dt = datetime.utcnow() - timedelta(seconds=offset)
-    return dt.isoformat()
+    The API derives created_at from the ObjectId timestamp, so backdating
+    the first four bytes is what spreads suggestions over time.
+    """
+    now = int(time.time())
+    stamps = now - rng.integers(0, days_back * 24 * 3600, size=size, endpoint=True)
+    return [ObjectId(int(t).to_bytes(4, "big") + rng.bytes(8)) for t in stamps]
 
 
-def _pick_templates(corridor_type: str, road_name: str, count: int) -> list[dict]:
+def _pick_indices(rng: np.random.Generator, pool_sizes: list[int], counts: list[int]) -> list[np.ndarray]:
     """
-    Pick `count` unique suggestions for a corridor, mixing type-specific
-    and generic templates.
+    Pick counts[i] unique indices into a pool of pool_sizes[i] for every row,
+    using a single argsort of random keys instead of a per-row sample.
     """
-    type_pool = TEMPLATES.get(corridor_type, TEMPLATES["mixed_exposure"])
+    order = rng.random((len(counts), max(pool_sizes, default=0))).argsort(axis=1)
+    return [
+        row[row < size][:count]
+        for row, size, count in zip(order, pool_sizes, counts)
+    ]
+
+
+def _pick_templates(rng: np.random.Generator, road_groups: dict[str, dict], counts: list[int]) -> list[dict]:
+    """
+    Pick `counts[i]` unique suggestions for each corridor, mixing type-specific
+    and generic templates, and draw upvotes and timestamps for all of them at once.
+    """
+    names = list(road_groups)
+    pools = [
+        TEMPLATES.get(road_groups[name]["corridor_type"], TEMPLATES["mixed_exposure"])
+        for name in names
+    ]
 
     # Mix: ~70% type-specific, ~30% generic
-    n_typed = max(1, int(count * 0.7))
-    n_generic = count - n_typed
+    n_typed = [max(1, int(c * 0.7)) for c in counts]
+    n_generic = [c - t for c, t in zip(counts, n_typed)]
 
-    typed_picks = random.sample(type_pool, min(n_typed, len(type_pool)))
-    generic_picks = random.sample(GENERIC_SUGGESTIONS, min(n_generic, len(GENERIC_SUGGESTIONS)))
+    typed_idx = _pick_indices(rng, [len(p) for p in pools], n_typed)
+    generic_idx = _pick_indices(rng, [len(GENERIC_SUGGESTIONS)] * len(names), n_generic)
 
-    suggestions = []
-    for text in typed_picks + generic_picks:
-        suggestions.append({
-            "text": text.replace("{name}", road_name),
-            "upvotes": random.choices(
-                [0, 1, 2, 3, 5, 8, 13, 21],
-                weights=[10, 15, 20, 20, 15, 10, 7, 3],
-                k=1,
-            )[0],
-            "client_ip": random.choice(FAKE_IPS),
-            "created_at": _random_past_datetime(),
-        })
+    rows = [
+        (name, text)
+        for name, pool, t_idx, g_idx in zip(names, pools, typed_idx, generic_idx)
+        for text in [pool[i] for i in t_idx] + [GENERIC_SUGGESTIONS[i] for i in g_idx]
+    ]
 
-    return suggestions
+    total = len(rows)
+    upvotes = rng.choice(UPVOTE_VALUES, size=total, p=UPVOTE_WEIGHTS / UPVOTE_WEIGHTS.sum())
+    ids = _random_past_ids(rng, total)
+
+    return [
+        {
+            "_id": oid,
+            "corridor_id": name,
+            "text": text.replace("{name}", name),
+            "upvotes": votes,
+        }
+        for (name, text), votes, oid in zip(rows, upvotes.tolist(), ids)
+    ]
 
 
 def main():
@@ -206,36 +231,40 @@ def main():
 
     print(f"   Unique named corridors: {len(road_groups)}")
 
-    all_docs = []
-    for road_name, info in road_groups.items():
-        # More suggestions for higher-severity corridors
-        tier = info["severity_tier"]
-        base_count = {"critical": 6, "high": 4, "moderate": 3}.get(tier, 4)
-        # Add some randomness: ±1
-        count = max(2, base_count + random.randint(-1, 1))
+    rng = np.random.default_rng()
 
-        suggestions = _pick_templates(info["corridor_type"], road_name, count)
+    # More suggestions for higher-severity corridors, with some randomness: ±1
+    base_counts = np.array([
+        {"critical": 6, "high": 4, "moderate": 3}.get(info["severity_tier"], 4)
+        for info in road_groups.values()
+    ], dtype=int)
+    counts = np.maximum(2, base_counts + rng.integers(-1, 1, size=len(base_counts), endpoint=True))
 
-        for s in suggestions:
-            all_docs.append({
-                "corridor_id": road_name,
-                **s,
-            })
+    all_docs = _pick_templates(rng, road_groups, counts.tolist())
 
     # Shuffle so insertion order isn't grouped by corridor
-    random.shuffle(all_docs)
+    all_docs = [all_docs[i] for i in rng.permutation(len(all_docs))]
 
     # ── 5. Insert into MongoDB ──
     if all_docs:
         collection.insert_many(all_docs)
 
+    # Rebuild the per-corridor upvote totals the API reads from
+    totals: dict[str, int] = {}
+    for d in all_docs:
+        totals[d["corridor_id"]] = totals.get(d["corridor_id"], 0) + d["upvotes"]
+    stats = db["corridor_stats"]
+    stats.delete_many({})
+    if totals:
+        stats.insert_many([{"_id": cid, "total_upvotes": t} for cid, t in totals.items()])
+
     # ── 6. Summary ──
     print(f"\n✅ Inserted {len(all_docs)} suggestions across {len(road_groups)} corridors")
 
     # Show a sample
     print("\n── Sample suggestions ──")
-    samples = random.sample(all_docs, min(5, len(all_docs)))
-    for s in samples:
+    samples = rng.choice(len(all_docs), size=min(5, len(all_docs)), replace=False)
+    for s in (all_docs[i] for i in samples):
         print(f"  [{s['corridor_id']}] ({s['upvotes']}👍) {s['text'][:80]}...")
 
     print("\n🎉 Done!")
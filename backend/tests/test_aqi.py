@@ -5,6 +5,8 @@ Run with: pytest tests/test_aqi.py -v
 """
 import pytest
 import sys
+import json
+import numpy as np
 sys.path.insert(0, '/home/natya/Desktop/innovateNSUT/backend')
 
 from app.services.aqi_service import (
@@ -12,7 +14,9 @@ from app.services.aqi_service import (
     AQIStation, 
     normalize_aqi, 
     compute_multi_exposure_priority,
-    haversine_distance
+    compute_multi_exposure_priority_array,
+    haversine_distance,
+    haversine_nearest
 )
 from app.config import Settings
 
@@ -84,6 +88,38 @@ class TestMultiExposurePriority:
         # heat=0, green_deficit=0 (high NDVI=1), only AQI
         result = compute_multi_exposure_priority(0.0, 1.0, 1.0)
         assert result == pytest.approx(0.20)  # Only AQI weight
+    
+    def test_scalar_returns_python_float(self):
+        """Scalar inputs give a plain float, clamped to [0, 1]."""
+        result = compute_multi_exposure_priority(0.7, 0.2, 0.4)
+        assert type(result) is float
+        assert result == pytest.approx(0.45 * 0.7 + 0.35 * 0.8 + 0.20 * 0.4)
+        assert compute_multi_exposure_priority(2.0, -1.0, None) == 1.0
+        assert compute_multi_exposure_priority(-2.0, 2.0, None) == 0.0
+    
+    def test_nan_input_clamps_to_one(self):
+        """A NaN component falls through the clamp as 1.0, as it always has."""
+        assert compute_multi_exposure_priority(float('nan'), 0.5, None) == 1.0
+        assert compute_multi_exposure_priority(0.5, 0.5, float('nan')) == 1.0
+    
+    def test_array_matches_scalar(self):
+        """The array entry point agrees with the scalar formula elementwise."""
+        rng = np.random.default_rng(0)
+        heat, ndvi, aqi = rng.uniform(-0.2, 1.2, size=(3, 50))
+        aqi[::3] = np.nan  # no reading -> no-AQI weights
+        
+        result = compute_multi_exposure_priority_array(heat, ndvi, aqi)
+        expected = [
+            compute_multi_exposure_priority(h, n, None if np.isnan(a) else a)
+            for h, n, a in zip(heat, ndvi, aqi)
+        ]
+        assert result.shape == (50,)
+        np.testing.assert_allclose(result, expected, rtol=1e-12)
+    
+    def test_array_without_aqi(self):
+        """aqi_norm=None applies the no-AQI weights to every element."""
+        result = compute_multi_exposure_priority_array(np.array([0.5, 1.0]), np.array([0.5, 0.0]))
+        np.testing.assert_allclose(result, [0.5, 1.0])
 
 
 class TestHaversineDistance:
@@ -99,6 +135,25 @@ class TestHaversineDistance:
         # Anand Vihar to ITO is approximately 8km
         dist = haversine_distance(28.6469, 77.3164, 28.6289, 77.2405)
         assert 7 < dist < 9  # km
+    
+    def test_nearest_matches_brute_force(self):
+        """Batched nearest-station lookup agrees with pairwise distances."""
+        rng = np.random.default_rng(1)
+        slons, slats = rng.uniform(76.8, 77.4, 30), rng.uniform(28.4, 28.9, 30)
+        lons, lats = rng.uniform(76.8, 77.4, 100), rng.uniform(28.4, 28.9, 100)
+        
+        idx, dist = haversine_nearest(lons, lats, slons, slats)
+        
+        for i in range(len(lons)):
+            d = [haversine_distance(lons[i], lats[i], x, y) for x, y in zip(slons, slats)]
+            assert idx[i] == int(np.argmin(d))
+            assert dist[i] == pytest.approx(min(d))
+    
+    def test_nearest_single_point(self):
+        """A scalar query point returns length-1 arrays."""
+        idx, dist = haversine_nearest(77.2, 28.6, np.array([77.0, 77.21]), np.array([28.5, 28.6]))
+        assert idx.tolist() == [1]
+        assert dist[0] == pytest.approx(haversine_distance(77.2, 28.6, 77.21, 28.6))
 
 
 class TestAQIService:
@@ -119,12 +174,21 @@ class TestAQIService:
     def test_stations_have_required_fields(self, service):
         """All stations should have valid coordinates and PM2.5."""
         stations = service.fetch_stations()
-        for s in stations:
-            assert s.latitude is not None
-            assert s.longitude is not None
-            assert 28.3 < s.latitude < 29.0  # Delhi bounds
-            assert 76.7 < s.longitude < 77.5  # Delhi bounds
-            assert s.pm25 is not None or s.pm10 is not None
+        lats = np.array([s.latitude for s in stations], dtype=float)
+        lons = np.array([s.longitude for s in stations], dtype=float)
+        assert not np.isnan(lats).any() and not np.isnan(lons).any()
+        assert np.all((lats > 28.3) & (lats < 29.0))  # Delhi bounds
+        assert np.all((lons > 76.7) & (lons < 77.5))  # Delhi bounds
+        assert all(s.pm25 is not None or s.pm10 is not None for s in stations)
+    
+    def test_filter_to_delhi_bounds(self, service):
+        """Stations outside Delhi should be dropped, order preserved."""
+        inside = service._get_fallback_stations()
+        outside = AQIStation(
+            station_id="far", name="Mumbai", latitude=19.07, longitude=72.87,
+            pm25=100.0, pm10=None, timestamp=inside[0].timestamp, source="test"
+        )
+        assert service._filter_to_delhi_bounds([outside] + inside) == inside
     
     def test_stations_to_geojson(self, service):
         """GeoJSON output should be valid."""
@@ -143,6 +207,21 @@ class TestAQIService:
             assert "aqi_raw" in feature["properties"]
             assert "aqi_norm" in feature["properties"]
     
+    def test_stations_to_geojson_bytes(self, service):
+        """Pre-encoded GeoJSON decodes to the same document."""
+        service._cache.update(service._get_fallback_stations())
+        assert json.loads(service.stations_to_geojson_bytes()) == service.stations_to_geojson()
+    
+    def test_geojson_normalizes_missing_readings_to_none(self, service):
+        """Stations without a reading get aqi_norm None, others the scalar formula."""
+        stations = service._get_fallback_stations()[:2]
+        stations[0].pm25 = stations[0].pm10 = None
+        service._cache.update(stations)
+        
+        props = [f["properties"] for f in service.stations_to_geojson()["features"]]
+        assert props[0]["aqi_norm"] is None
+        assert props[1]["aqi_norm"] == pytest.approx(normalize_aqi(stations[1].aqi_raw))
+    
     def test_get_aqi_at_point(self, service):
         """Should return AQI for any point in Delhi."""
         service.fetch_stations()
@@ -154,6 +233,27 @@ class TestAQIService:
         assert "distance_km" in result
         assert result["aqi_raw"] > 0
         assert 0 <= result["aqi_norm"] <= 1
+    
+    def test_get_aqi_at_points_matches_single_lookups(self, service):
+        """The batched lookup agrees with get_aqi_at_point, NaN for no reading."""
+        stations = service._get_fallback_stations()
+        stations[0].pm25 = stations[0].pm10 = None
+        service._cache.update(stations)
+        lons = np.array([s.longitude for s in stations] + [77.21, 77.05])
+        lats = np.array([s.latitude for s in stations] + [28.63, 28.55])
+        
+        raw, norm = service.get_aqi_at_points(lons, lats)
+        for i in range(len(lons)):
+            single = service.get_aqi_at_point(lons[i], lats[i])
+            expected_raw = np.nan if single["aqi_raw"] is None else single["aqi_raw"]
+            expected_norm = np.nan if single["aqi_norm"] is None else single["aqi_norm"]
+            np.testing.assert_allclose([raw[i], norm[i]], [expected_raw, expected_norm])
+        assert np.isnan(raw[0]) and np.isnan(norm[0])
+    
+    def test_get_aqi_at_points_without_stations(self, service):
+        """No cached stations gives all-NaN arrays."""
+        raw, norm = service.get_aqi_at_points(np.array([77.2, 77.3]), np.array([28.6, 28.7]))
+        assert np.isnan(raw).all() and np.isnan(norm).all()
 
 
 class TestFallbackData:
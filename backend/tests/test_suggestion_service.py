@@ -0,0 +1,130 @@
+"""
+Suggestion Service Tests — Verify suggestion ordering, the read caches
+and the corridor upvote counters.
+
+Run with: pytest tests/test_suggestion_service.py -v
+"""
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from app.services import suggestion_service
+from app.services.suggestion_service import SuggestionService
+from app.config import Settings
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """Suggestion service backed by an in-memory MongoDB."""
+    mongomock = pytest.importorskip("mongomock")
+    client = mongomock.MongoClient()
+    monkeypatch.setattr(suggestion_service, "MongoClient", lambda *args, **kwargs: client)
+    return SuggestionService(Settings())
+
+
+def legacy_doc(corridor_id, text, upvotes, created_at, id_time):
+    """A suggestion as older versions stored it, with its own created_at."""
+    return {
+        "_id": ObjectId.from_datetime(id_time),
+        "corridor_id": corridor_id,
+        "text": text,
+        "upvotes": upvotes,
+        "created_at": created_at,
+    }
+
+
+class TestCreatedAt:
+    """Test creation times of migrated and unmigrated suggestions."""
+    
+    def test_derived_created_at_is_naive_iso(self, service):
+        """Derived timestamps keep the stored format: naive UTC, no offset."""
+        created = service.create_suggestion("c1", "More shade trees please", "1.1.1.1")
+        parsed = datetime.fromisoformat(created["created_at"])
+        assert parsed.tzinfo is None
+        assert service.get_suggestions("c1")[0]["created_at"] == created["created_at"]
+    
+    def test_legacy_created_at_breaks_ties(self, service):
+        """Unmigrated documents with equal upvotes rank by stored created_at."""
+        service._collection.insert_many([
+            legacy_doc("c1", "Newer", 2, "2024-03-01T10:00:00", datetime(2024, 1, 1)),
+            legacy_doc("c1", "Older", 2, "2024-02-01T10:00:00.250000", datetime(2024, 6, 1)),
+            legacy_doc("c1", "Top", 5, "2024-04-01T10:00:00", datetime(2024, 4, 1)),
+        ])
+        
+        ranked = service.get_suggestions("c1")
+        assert [s["text"] for s in ranked] == ["Top", "Older", "Newer"]
+        assert ranked[1]["created_at"] == "2024-02-01T10:00:00.250000"
+    
+    def test_admin_list_orders_legacy_by_created_at(self, service):
+        """The admin list sorts unmigrated documents by stored created_at."""
+        service._collection.insert_many([
+            legacy_doc("c1", "Backdated", 0, "2023-01-01T00:00:00", datetime(2025, 1, 1)),
+            legacy_doc("c1", "Recent", 0, "2024-06-01T00:00:00", datetime(2024, 6, 1)),
+        ])
+        service.create_suggestion("c2", "Plant a hedge", "1.1.1.1")
+        
+        service._has_legacy_created_at = True  # Normally detected on connect
+        listed = [s["text"] for s in service.get_all_suggestions()]
+        assert listed == ["Plant a hedge", "Recent", "Backdated"]
+
+
+class TestReadCaches:
+    """Test the suggestion list and count micro-caches."""
+    
+    def test_writes_invalidate_caches(self, service):
+        """New suggestions and upvotes are visible immediately."""
+        service.create_suggestion("c1", "More shade trees please", "1.1.1.1")
+        assert service.get_suggestion_count("c1") == 1
+        
+        created = service.create_suggestion("c1", "Add water fountains", "1.1.1.1")
+        assert service.get_suggestion_count("c1") == 2
+        
+        service.upvote_suggestion(created["id"], "2.2.2.2")
+        ranked = service.get_suggestions("c1")
+        assert ranked[0]["id"] == created["id"] and ranked[0]["upvotes"] == 1
+    
+    def test_cached_list_is_not_shared(self, service):
+        """Mutating a returned list does not leak into later reads."""
+        service.create_suggestion("c1", "More shade trees please", "1.1.1.1")
+        first = service.get_suggestions("c1")
+        first[0]["text"] = "changed"
+        first.append({})
+        
+        second = service.get_suggestions("c1")
+        assert len(second) == 1
+        assert second[0]["text"] == "More shade trees please"
+    
+    def test_stale_fill_is_dropped(self, service):
+        """A read that overlaps a write does not repopulate the cache."""
+        service.create_suggestion("c1", "More shade trees please", "1.1.1.1")
+        count = service._collection.count_documents
+        
+        def racing_count(query):
+            result = count(query)
+            service.create_suggestion("c1", "Add water fountains", "1.1.1.1")
+            return result
+        
+        service._collection.count_documents = racing_count
+        assert service.get_suggestion_count("c1") == 1
+        assert "c1" not in service._count_cache
+
+
+class TestCorridorUpvoteTotals:
+    """Test the denormalized per-corridor upvote totals."""
+    
+    def test_upvotes_update_corridor_total(self, service):
+        """Each upvote increments the denormalized per-corridor total."""
+        a = service.create_suggestion("c1", "More shade trees please", "1.1.1.1")
+        b = service.create_suggestion("c1", "Add water fountains", "1.1.1.1")
+        service.create_suggestion("c2", "Plant a hedge", "1.1.1.1")
+        
+        for sid in (a["id"], a["id"], b["id"]):
+            service.upvote_suggestion(sid, "2.2.2.2")
+        
+        assert service.get_total_upvotes("c1") == 3
+        assert service.get_total_upvotes("c2") == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,80 @@
+"""
+Tile Service Tests — Verify tile colouring and the empty-tile cache.
+
+Run with: pytest tests/test_tile_service.py -v
+"""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.services import tile_service
+from app.services.tile_service import TileService
+from app.config import Settings
+
+
+@pytest.fixture
+def tiles():
+    """Tile service over a small in-memory, all-NoData raster."""
+    calls = []
+    data = np.full((64, 64), np.nan, dtype=np.float32)
+    raster = SimpleNamespace(
+        settings=Settings(),
+        gdi=None,
+        lst=None,
+        bounds=(77.0, 28.5, 77.1, 28.6),
+        get_layer_data=lambda layer: calls.append(layer) or data,
+    )
+    service = TileService(raster)
+    service.calls = calls
+    return service
+
+
+class TestColourLUT:
+    """Test the precomputed colour lookup tables."""
+    
+    def test_lut_rows(self, tiles):
+        """LUTs have 256 colour rows plus one transparent NoData row."""
+        lut = tiles._luts['ndvi']
+        assert lut.shape == (257, 4) and lut.dtype == np.uint8
+        assert lut[TileService.NODATA_INDEX].tolist() == [0, 0, 0, 0]
+        assert (lut[:256, 3] == 255).all()
+
+
+class TestQuantize:
+    """Test value-to-LUT-index quantization."""
+    
+    @pytest.mark.parametrize("use_numexpr", [True, False])
+    def test_quantize_edge_values(self, tiles, monkeypatch, use_numexpr):
+        """NaN maps to NoData and ±inf clamp to the end bins on both paths."""
+        if use_numexpr and not tile_service.HAS_NUMEXPR:
+            pytest.skip("numexpr not installed")
+        monkeypatch.setattr(tile_service, "HAS_NUMEXPR", use_numexpr)
+        
+        data = np.array([np.nan, -np.inf, np.inf, -5.0, 0.0, 0.5, 1.0, 5.0], dtype=np.float32)
+        idx = tiles._quantize(data, 0.0, 1.0)
+        
+        assert idx.tolist() == [256, 0, 255, 0, 0, 128, 255, 255]
+
+
+class TestEmptyTileCache:
+    """Test the sentinel cached for tiles with nothing to draw."""
+    
+    def test_empty_tile_outside_bounds_is_cached(self, tiles):
+        """Off-raster tiles return None without touching the raster again."""
+        assert tiles.get_tile('ndvi', 10, 0, 0) is None
+        assert tiles._cache[('ndvi', 10, 0, 0)] is TileService._EMPTY_TILE
+        assert tiles.get_tile('ndvi', 10, 0, 0) is None
+        assert tiles.calls == []
+    
+    def test_all_nan_tile_is_cached(self, tiles):
+        """A tile over NoData is rendered once, then served from the sentinel."""
+        # Zoom-12 tile covering (77.05, 28.55)
+        x, y = 2924, 1708
+        assert tiles.get_tile('ndvi', 12, x, y) is None
+        assert tiles.get_tile('ndvi', 12, x, y) is None
+        assert tiles.calls == ['ndvi']
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
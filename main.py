@@ -14,19 +14,28 @@ import warnings
 import numpy as np
 import rasterio
 from rasterio.plot import show
-from rasterio.windows import from_bounds
+from rasterio.windows import from_bounds, Window
 from rasterio.transform import rowcol, Affine
-from scipy.ndimage import zoom
+from rasterio.warp import reproject, transform_bounds, Resampling
 import geopandas as gpd
+import shapely
 from shapely.geometry import box, LineString, Point
-from shapely.ops import unary_union
-import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
-from matplotlib.colors import LinearSegmentedColormap, Normalize
-from matplotlib.lines import Line2D
-import contextily as ctx
-import osmnx as ox
 import pandas as pd
+import math
+import functools
+import gc
+import socket
+import urllib.parse
+import hashlib
+import time
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
 
 warnings.filterwarnings('ignore')
 
@@ -38,6 +47,8 @@ warnings.filterwarnings('ignore')
 NDVI_PATH = "delhi_ndvi_10m.tif"  # Sentinel-2 NDVI, 10m resolution
 LST_PATH = "delhi_lst_modis_daily_celsius.tif"    # MODIS LST, ~1km resolution
 OUTPUT_DIR = "./figures/"
+CACHE_DIR = "./cache/"  # Resampled LST + sampled road network, reused across runs
+ROADS_CACHE_MAX_AGE_DAYS = 30  # Re-fetch OSM roads after this, so map edits are picked up
 
 # DELHI BOUNDS (approximate)
 DELHI_BOUNDS = {
@@ -47,20 +58,27 @@ DELHI_BOUNDS = {
     'west': 76.73
 }
 
+# OSM ROAD CLASSES (figures 5 and 7)
+ROAD_TAGS = {
+    'highway': ['motorway', 'trunk', 'primary', 'secondary', 'tertiary']
+}
+
 # VISUALIZATION DEFAULTS
 DPI = 300
 FIGSIZE_16_9 = (16, 9)  # 16:9 aspect ratio for slides
+DISPLAY_MAX_PX = FIGSIZE_16_9[1] * DPI * 2  # Raster rows handed to imshow (~2× output)
+PNG_SAVE_KWARGS = {'compress_level': 1, 'optimize': False}  # Fast zlib; files get ~15% larger
+PANEL_HEIGHT = FIGSIZE_16_9[1] * 0.77  # Figure 7 map height: same as a default 16:9 subplot
 FIGSIZE_SQUARE = (12, 12)
 BACKGROUND_COLOR = '#f5f5f5'
 TEXT_COLOR = '#333333'
 
 # COLOR MAPS
-CMAP_HEAT = plt.cm.RdYlBu_r  # Red for hot
-CMAP_NDVI = plt.cm.YlGn      # Green for vegetation
+# Names / colour stops only: Matplotlib is imported lazily by the figure code
+CMAP_HEAT = 'RdYlBu_r'  # Red for hot
+CMAP_NDVI = 'YlGn'      # Green for vegetation
 # Priority: Green (already green, low GDI) → Yellow → Red (needs VanSetu corridors, high GDI)
-CMAP_PRIORITY = LinearSegmentedColormap.from_list(
-    'priority', ['#1a9850', '#fee090', '#d73027']  # Green → Yellow → Red
-)
+CMAP_PRIORITY_COLORS = ['#1a9850', '#fee090', '#d73027']  # Green → Yellow → Red
 
 # ============================================================================
 # HELPER FUNCTIONS
@@ -72,28 +90,97 @@ def ensure_output_dir():
     print(f"✓ Output directory ready: {OUTPUT_DIR}")
 
 
-def load_geotiff(filepath):
+@dataclass(slots=True)
+class RasterMeta:
+    """Raster metadata used downstream, read once from the open dataset."""
+    crs: object
+    transform: Affine
+    nodata: object
+    width: int
+    height: int
+    dtype: str
+
+
+def delhi_bbox():
+    """DELHI_BOUNDS as a (west, south, east, north) tuple."""
+    return (
+        DELHI_BOUNDS['west'],
+        DELHI_BOUNDS['south'],
+        DELHI_BOUNDS['east'],
+        DELHI_BOUNDS['north']
+    )
+
+
+def covering_window(window, width, height):
+    """
+    Smallest whole-pixel window containing a fractional one, clamped to a
+    width × height raster.
+    
+    Rounds outward (floor the offsets, ceil the far edges): truncating
+    instead would drop the partially covered east/south pixel, which for a
+    coarse raster leaves that edge uncovered after warping.
+    """
+    col_off = math.floor(window.col_off)
+    row_off = math.floor(window.row_off)
+    col_end = math.ceil(window.col_off + window.width)
+    row_end = math.ceil(window.row_off + window.height)
+    return Window(col_off, row_off, col_end - col_off, row_end - row_off).intersection(
+        Window(0, 0, width, height)
+    )
+
+
+def bounds_window(src, bounds):
+    """
+    Whole-pixel window of an open raster covering (west, south, east, north)
+    bounds given in EPSG:4326.
+    """
+    return covering_window(
+        from_bounds(*transform_bounds('EPSG:4326', src.crs, *bounds), transform=src.transform),
+        src.width, src.height
+    )
+
+
+def load_geotiff(filepath, bounds=None):
     """
     Load a GeoTIFF file using rasterio.
     
     Args:
         filepath (str): Path to GeoTIFF file
+        bounds (tuple): Optional (west, south, east, north) in EPSG:4326;
+            only the window covering these bounds is read
         
     Returns:
         data (np.ndarray): Raster data
-        profile (dict): Raster metadata (CRS, transform, etc.)
+        profile (RasterMeta): Raster metadata (CRS, transform, etc.)
     """
     if not os.path.exists(filepath):
         raise FileNotFoundError(f"GeoTIFF not found: {filepath}")
     
     with rasterio.open(filepath) as src:
-        data = src.read(1)  # Read first band
-        profile = src.profile
+        # Decode straight to float32 (no float64 copy); everything downstream
+        # works in float32, which halves memory traffic in the raster kernels
+        if bounds is None:
+            data = src.read(1, out_dtype=np.float32)  # Read first band
+            transform = src.transform
+        else:
+            # Read only the pixels covering the bounds, clamped to the file
+            window = bounds_window(src, bounds)
+            data = src.read(1, window=window, out_dtype=np.float32)
+            transform = src.window_transform(window)
+        
+        meta = RasterMeta(
+            crs=src.crs,
+            transform=transform,
+            nodata=src.nodata,
+            width=data.shape[1],
+            height=data.shape[0],
+            dtype=data.dtype.name
+        )
     
     print(f"✓ Loaded: {filepath}")
-    print(f"  - Shape: {data.shape}, CRS: {profile['crs']}, NoData: {profile['nodata']}")
+    print(f"  - Shape: {data.shape}, CRS: {meta.crs}, NoData: {meta.nodata}")
     
-    return data, profile
+    return data, meta
 
 
 def normalize_array(arr, vmin=None, vmax=None):
@@ -108,19 +195,112 @@ def normalize_array(arr, vmin=None, vmax=None):
     Returns:
         normalized (np.ndarray): Normalized array in [0, 1]
     """
-    # Handle NoData (typically masked or NaN)
-    valid_mask = np.isfinite(arr)
-    
+    # NaN-aware reductions skip NoData without building a mask
     if vmin is None:
-        vmin = np.nanmin(arr[valid_mask]) if np.any(valid_mask) else 0
+        vmin = np.nanmin(arr)
+        if np.isnan(vmin):
+            vmin = 0
     if vmax is None:
-        vmax = np.nanmax(arr[valid_mask]) if np.any(valid_mask) else 1
+        vmax = np.nanmax(arr)
+        if np.isnan(vmax):
+            vmax = 1
     
-    normalized = np.zeros_like(arr, dtype=np.float32)
-    normalized[valid_mask] = (arr[valid_mask] - vmin) / (vmax - vmin + 1e-8)
-    normalized[~valid_mask] = np.nan
+    return _normalize_fixed(arr, vmin, vmax)
+
+
+def _normalize_fixed(arr, vmin, vmax):
+    """
+    normalize_array for known bounds: no min/max reductions, no mask.
     
-    return np.clip(normalized, 0, 1)
+    One float32 buffer, rescaled and clipped in place (no temporaries);
+    NaN (NoData) propagates through the arithmetic.
+    """
+    # Epsilon keeps flat data (vmin == vmax) finite; added in float64, since
+    # float32 bounds (e.g. from nanmin/nanmax) would round it away
+    scale = np.float32(1.0 / (float(vmax) - float(vmin) + 1e-8))
+    out = np.empty(arr.shape, np.float32)
+    np.subtract(arr, vmin, out=out, dtype=np.float32)
+    np.multiply(out, scale, out=out)
+    np.clip(out, 0, 1, out=out)
+    return out
+
+
+if HAS_NUMBA:
+    # fastmath without 'nnan'/'ninf' so the NoData (NaN) check survives
+    # Explicit signature + cache=True: compiled once, later runs load from __pycache__
+    @njit('void(f4[:, :], f4[:, :], f4[:, :], f4[:, :], f4[:, :])', parallel=True,
+          fastmath={'nsz', 'arcp', 'contract', 'afn', 'reassoc'}, cache=True)
+    def _gdi_and_norms(ndvi, lst, out_ndvi_n, out_lst_n, out_gdi):
+        """Fused normalize + clip + weight pass over NDVI/LST (see compute_norms_and_gdi)."""
+        for i in prange(ndvi.shape[0]):
+            for j in range(ndvi.shape[1]):
+                n = ndvi[i, j]
+                t = lst[i, j]
+                ndvi_n = min(max((n + 0.2) / 1.0, 0.0), 1.0)
+                lst_n = min(max((t - 22.0) / 10.0, 0.0), 1.0)
+                out_ndvi_n[i, j] = np.nan if math.isnan(n) else ndvi_n
+                out_lst_n[i, j] = np.nan if math.isnan(t) else lst_n
+                if math.isnan(n) or math.isnan(t):
+                    out_gdi[i, j] = np.nan
+                else:
+                    out_gdi[i, j] = 0.6 * lst_n + 0.4 * (1.0 - ndvi_n)
+    
+    @njit('void(f4[:, :], f4[:, :], f4[:, :])', parallel=True,
+          fastmath={'nsz', 'arcp', 'contract', 'afn', 'reassoc'}, cache=True)
+    def _gdi_only(ndvi, lst, out_gdi):
+        """_gdi_and_norms without the normalized outputs (see compute_green_deficit_index)."""
+        for i in prange(ndvi.shape[0]):
+            for j in range(ndvi.shape[1]):
+                n = ndvi[i, j]
+                t = lst[i, j]
+                if math.isnan(n) or math.isnan(t):
+                    out_gdi[i, j] = np.nan
+                    continue
+                lst_n = min(max((t - 22.0) / 10.0, 0.0), 1.0)
+                ndvi_n = min(max((n + 0.2) / 1.0, 0.0), 1.0)
+                out_gdi[i, j] = 0.6 * lst_n + 0.4 * (1.0 - ndvi_n)
+
+
+def compute_norms_and_gdi(ndvi, lst):
+    """
+    Normalized NDVI, normalized LST and the Green Deficit Index in one go.
+    
+    Same bounds as the figures use (NDVI -0.2..0.8, LST 22..32 °C), so the
+    normalized rasters can be shared by figures 1–3 and the GDI by 4–7.
+    
+    Args:
+        ndvi (np.ndarray): NDVI raster [-1, 1]
+        lst (np.ndarray): Land Surface Temperature [°C], same grid as ndvi
+        
+    Returns:
+        ndvi_norm, lst_norm, gdi (np.ndarray): float32 rasters in [0, 1], NaN = NoData
+    """
+    if HAS_NUMBA:
+        # Single fused pass, no intermediate rasters
+        ndvi_norm = np.empty(ndvi.shape, np.float32)
+        lst_norm = np.empty(ndvi.shape, np.float32)
+        gdi = np.empty(ndvi.shape, np.float32)
+        _gdi_and_norms(
+            np.asarray(ndvi, dtype=np.float32),
+            np.asarray(lst, dtype=np.float32),
+            ndvi_norm, lst_norm, gdi
+        )
+        return ndvi_norm, lst_norm, gdi
+    
+    # Normalize inputs (fixed bounds, so skip the general path)
+    ndvi_norm = _normalize_fixed(ndvi, -0.2, 0.8)
+    lst_norm = _normalize_fixed(lst, 22, 32)
+    
+    return ndvi_norm, lst_norm, _gdi_from_norms(ndvi_norm, lst_norm)
+
+
+def _gdi_from_norms(ndvi_norm, lst_norm):
+    """GDI from normalized rasters, computed in place in float32."""
+    gdi = np.multiply(lst_norm, np.float32(0.6))
+    gdi += np.float32(0.4)
+    gdi -= np.float32(0.4) * ndvi_norm
+    np.clip(gdi, 0, 1, out=gdi)
+    return gdi
 
 
 def compute_green_deficit_index(ndvi, lst):
@@ -132,18 +312,24 @@ def compute_green_deficit_index(ndvi, lst):
     Args:
         ndvi (np.ndarray): NDVI raster [-1, 1]
         lst (np.ndarray): Land Surface Temperature [°C]
-        
+    
     Returns:
         gdi (np.ndarray): Green Deficit Index [0, 1] (0=low priority, 1=high priority)
     """
-    # Normalize inputs
-    ndvi_norm = normalize_array(ndvi, vmin=-0.2, vmax=0.8)
-    lst_norm = normalize_array(lst, vmin=22, vmax=32)
-    
-    # Compute GDI
-    gdi = (lst_norm * 0.6) + ((1 - ndvi_norm) * 0.4)
+    if HAS_NUMBA:
+        # Single fused pass, writing only the GDI raster
+        gdi = np.empty(ndvi.shape, np.float32)
+        _gdi_only(
+            np.asarray(ndvi, dtype=np.float32),
+            np.asarray(lst, dtype=np.float32),
+            gdi
+        )
+        return gdi
     
-    return np.clip(gdi, 0, 1)
+    return _gdi_from_norms(
+        _normalize_fixed(ndvi, -0.2, 0.8),
+        _normalize_fixed(lst, 22, 32)
+    )
 
 
 def get_delhi_bounds_utm(profile_crs):
@@ -156,6 +342,12 @@ def get_delhi_bounds_utm(profile_crs):
     Returns:
         bounds (tuple): (minx, miny, maxx, maxy)
     """
+    return _bounds_for_crs(profile_crs.to_string())
+
+
+@functools.lru_cache(maxsize=8)
+def _bounds_for_crs(crs_str):
+    """Reproject DELHI_BOUNDS into crs_str (memoized; the box never changes)."""
     bounds_geom = box(
         DELHI_BOUNDS['west'],
         DELHI_BOUNDS['south'],
@@ -164,13 +356,12 @@ def get_delhi_bounds_utm(profile_crs):
     )
     
     # If raster is not in EPSG:4326, reproject bounds
-    if profile_crs.to_string() != 'EPSG:4326':
-        from rasterio.crs import CRS
+    if crs_str != 'EPSG:4326':
         gdf = gpd.GeoDataFrame(
             {'geometry': [bounds_geom]},
             crs='EPSG:4326'
         )
-        gdf = gdf.to_crs(profile_crs)
+        gdf = gdf.to_crs(crs_str)
         bounds_geom = gdf.geometry.iloc[0]
     
     return bounds_geom.bounds
@@ -182,26 +373,79 @@ def resample_raster_to_match(source_data, source_profile, target_data, target_pr
     
     Args:
         source_data (np.ndarray): Source raster data
-        source_profile (dict): Source raster profile
+        source_profile (RasterMeta): Source raster metadata
         target_data (np.ndarray): Target raster data (for shape reference)
-        target_profile (dict): Target raster profile
+        target_profile (RasterMeta): Target raster metadata
         
     Returns:
         resampled (np.ndarray): Resampled data matching target shape
     """
-    from rasterio.transform import Affine
-    from scipy.ndimage import zoom
+    # Warp on the geotransforms (not just the shape ratio) with GDAL's
+    # multithreaded bilinear resampler
+    resampled = np.empty(target_data.shape, np.float32)
+    reproject(
+        source=source_data,
+        destination=resampled,
+        src_transform=source_profile.transform,
+        src_crs=source_profile.crs,
+        src_nodata=source_profile.nodata,
+        dst_transform=target_profile.transform,
+        dst_crs=target_profile.crs,
+        dst_nodata=np.nan,
+        resampling=Resampling.bilinear,
+        num_threads=os.cpu_count()
+    )
+    
+    return resampled
+
+
+def load_resampled_lst(lst_data, lst_profile, target_data, target_profile):
+    """
+    LST resampled onto the NDVI grid, cached as a GeoTIFF between runs.
     
-    # Calculate zoom factors
-    zoom_row = source_data.shape[0] / target_data.shape[0]
-    zoom_col = source_data.shape[1] / target_data.shape[1]
+    The file name is keyed on both grids (CRS, transform, size) and the
+    clip bounds, so a different window or reprojected input never reuses a
+    stale warp. A matching cache is reused while it is newer than both
+    input rasters; otherwise the warp is redone and the cache rewritten.
+    
+    Args:
+        lst_data (np.ndarray): Original LST raster
+        lst_profile (RasterMeta): Original LST metadata
+        target_data (np.ndarray): NDVI raster (for shape reference)
+        target_profile (RasterMeta): NDVI metadata
     
-    # Resample using scipy
-    resampled = zoom(source_data, (1/zoom_row, 1/zoom_col), order=1)
+    Returns:
+        resampled (np.ndarray): float32 LST matching target shape
+    """
+    height, width = target_data.shape
+    key = repr((
+        target_profile.crs.to_string(), repr(target_profile.transform), width, height,
+        lst_profile.crs.to_string(), repr(lst_profile.transform),
+        lst_profile.width, lst_profile.height, sorted(DELHI_BOUNDS.items())
+    ))
+    digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+    path = os.path.join(
+        CACHE_DIR, f"{os.path.basename(LST_PATH)}.resampled_{height}x{width}_{digest}.tif"
+    )
     
-    # Ensure exact shape match
-    if resampled.shape != target_data.shape:
-        resampled = resampled[:target_data.shape[0], :target_data.shape[1]]
+    if os.path.exists(path) and os.path.getmtime(path) > max(
+        os.path.getmtime(LST_PATH), os.path.getmtime(NDVI_PATH)
+    ):
+        with rasterio.open(path, sharing=False) as src:
+            resampled = src.read(1, out_dtype=np.float32)
+        print(f"  ✓ Loaded resampled LST from cache: {path}")
+        return resampled
+    
+    resampled = resample_raster_to_match(lst_data, lst_profile, target_data, target_profile)
+    
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with rasterio.open(
+        path, 'w', driver='GTiff',
+        height=height, width=width, count=1, dtype='float32',
+        crs=target_profile.crs, transform=target_profile.transform, nodata=np.nan
+    ) as dst:
+        dst.write(resampled, 1)
+    print(f"  ✓ Cached resampled LST: {path}")
     
     return resampled
 
@@ -219,35 +463,25 @@ def fetch_roads_delhi(tags=None):
     Raises:
         RuntimeError: If OSM fetch fails
     """
+    import osmnx as ox
+    
     print("⏳ Fetching road network from OpenStreetMap (this may take 1–2 minutes)...")
     
     if tags is None:
-        tags = {
-            'highway': ['motorway', 'trunk', 'primary', 'secondary', 'tertiary']
-        }
-    
-    # OSMnx bbox format: (left, bottom, right, top) = (west, south, east, north)
-    bbox = (
-        DELHI_BOUNDS['west'],
-        DELHI_BOUNDS['south'],
-        DELHI_BOUNDS['east'],
-        DELHI_BOUNDS['north']
-    )
-    
-    # Fetch features from OSM
-    features = ox.features_from_bbox(bbox=bbox, tags=tags)
+        tags = ROAD_TAGS
     
-    # Convert to GeoDataFrame and filter to LineString geometries
-    gdf = gpd.GeoDataFrame(features).reset_index()
+    # Fetch features from OSM; bbox format: (left, bottom, right, top) = (west, south, east, north)
+    features = ox.features_from_bbox(bbox=delhi_bbox(), tags=tags)
     
-    # Keep only LineString and MultiLineString geometries (roads)
-    valid_geom_types = ['LineString', 'MultiLineString']
-    gdf = gdf[gdf.geometry.geom_type.isin(valid_geom_types)].copy()
+    # Keep only LineString and MultiLineString geometries (roads); filter
+    # before resetting the index so only the kept rows are copied, once
+    mask = features.geometry.geom_type.isin(('LineString', 'MultiLineString'))
+    gdf = features.loc[mask].reset_index()
     
-    # Ensure CRS is EPSG:4326
+    # Ensure CRS is EPSG:4326 (OSMnx already returns it, so usually a no-op)
     if gdf.crs is None:
         gdf = gdf.set_crs('EPSG:4326')
-    else:
+    elif gdf.crs.to_epsg() != 4326:
         gdf = gdf.to_crs('EPSG:4326')
     
     if len(gdf) == 0:
@@ -270,67 +504,360 @@ def sample_raster_along_roads(gdf, raster, transform, buffer_distance=0.002):
     Returns:
         gdf (GeoDataFrame): Original GDF with new 'raster_mean' column
     """
-    from rasterio.transform import rowcol
-    from shapely.geometry import MultiLineString
-    
-    sampled_values = []
     raster_height, raster_width = raster.shape
+    geoms = np.asarray(gdf.geometry.values, dtype=object)
+    
+    # Densify every line inside GEOS (~100m spacing, at least ~10 points per
+    # line) and take all vertices at once; empty/missing geometries yield
+    # no points and end up NaN
+    lengths = np.nan_to_num(shapely.length(geoms))
+    max_segment = np.where(lengths > 0, np.minimum(0.001, lengths / 10), 0.001)
+    densified = shapely.segmentize(geoms, max_segment)
+    coords, seg_ids = shapely.get_coordinates(densified, return_index=True)
+    lons = coords[:, 0]
+    lats = coords[:, 1]
+    
+    # Convert geographic coordinates to raster row/col with the inverse affine
+    inv = ~transform
+    
+    if HAS_NUMBA:
+        # seg_ids come out of get_coordinates sorted: each segment's points
+        # are one contiguous run, so segments can be reduced in parallel
+        offsets = np.searchsorted(seg_ids, np.arange(len(geoms) + 1))
+        sampled_values = _segment_means(
+            lons, lats, offsets,
+            np.asarray(raster, dtype=np.float32),
+            np.array([inv.a, inv.b, inv.c, inv.d, inv.e, inv.f])
+        )
+        return _attach_raster_mean(gdf, sampled_values)
     
-    for geom in gdf.geometry:
-        try:
-            # Handle MultiLineString by converting to list of coordinates
-            if isinstance(geom, MultiLineString):
-                all_coords = []
-                for line in geom.geoms:
-                    all_coords.extend(list(line.coords))
-                coords = np.array(all_coords)
-            else:
-                coords = np.array(geom.coords)
-            
-            if len(coords) == 0:
-                sampled_values.append(np.nan)
-                continue
-            
-            # Sample points along the line at regular intervals
-            # Interpolate to get more sample points
-            num_samples = max(10, int(geom.length / 0.001))  # ~100m intervals
-            
-            sample_points = []
-            for i in range(num_samples):
-                point = geom.interpolate(i / num_samples, normalized=True)
-                sample_points.append((point.x, point.y))
-            
-            # Convert geographic coordinates to raster row/col indices
-            pixel_values = []
-            for lon, lat in sample_points:
-                try:
-                    row, col = rowcol(transform, lon, lat)
-                    # Check bounds
-                    if 0 <= row < raster_height and 0 <= col < raster_width:
-                        val = raster[row, col]
-                        if np.isfinite(val):
-                            pixel_values.append(val)
-                except Exception:
-                    continue
-            
-            if len(pixel_values) > 0:
-                sampled_values.append(np.mean(pixel_values))
-            else:
-                sampled_values.append(np.nan)
-                
-        except Exception as e:
-            sampled_values.append(np.nan)
+    cols = np.floor(inv.a * lons + inv.b * lats + inv.c)
+    rows = np.floor(inv.d * lons + inv.e * lats + inv.f)
+    
+    # Keep in-bounds samples
+    in_bounds = (rows >= 0) & (rows < raster_height) & (cols >= 0) & (cols < raster_width)
+    flat = rows[in_bounds].astype(np.int64) * raster_width + cols[in_bounds].astype(np.int64)
+    seg_ids = seg_ids[in_bounds]
+    
+    values = np.take(raster, flat)
+    
+    finite = np.isfinite(values)
+    values = values[finite]
+    seg_ids = seg_ids[finite]
     
+    # Per-segment mean in one shot
+    sums = np.bincount(seg_ids, weights=values, minlength=len(geoms))
+    hits = np.bincount(seg_ids, minlength=len(geoms))
+    sampled_values = np.full(len(geoms), np.nan)
+    np.divide(sums, hits, out=sampled_values, where=hits > 0)
+    
+    return _attach_raster_mean(gdf, sampled_values)
+
+
+def _attach_raster_mean(gdf, sampled_values):
+    """Copy of gdf with the per-segment means as 'raster_mean' (and a progress line)."""
     gdf = gdf.copy()
     gdf['raster_mean'] = sampled_values
     
     # Report sampling success rate
-    valid_count = sum(1 for v in sampled_values if np.isfinite(v))
+    valid_count = int(np.isfinite(sampled_values).sum())
     print(f"  ✓ Sampled GDI for {valid_count}/{len(gdf)} road segments")
     
     return gdf
 
 
+if HAS_NUMBA:
+    @njit('f8[:](f8[:], f8[:], i8[:], f4[:, :], f8[:])', parallel=True, cache=True)
+    def _segment_means(xs, ys, offsets, raster, inv):
+        """
+        Mean of the finite raster values under each segment's sample points
+        (points offsets[k]:offsets[k + 1]); NaN where none fall in bounds.
+        inv is the inverse affine (a, b, c, d, e, f).
+        """
+        height, width = raster.shape
+        out = np.empty(offsets.shape[0] - 1)
+        for k in prange(offsets.shape[0] - 1):
+            total = 0.0
+            hits = 0
+            for p in range(offsets[k], offsets[k + 1]):
+                col = math.floor(inv[0] * xs[p] + inv[1] * ys[p] + inv[2])
+                row = math.floor(inv[3] * xs[p] + inv[4] * ys[p] + inv[5])
+                if 0 <= row < height and 0 <= col < width:
+                    v = raster[row, col]
+                    if math.isfinite(v):
+                        total += v
+                        hits += 1
+            out[k] = total / hits if hits > 0 else np.nan
+        return out
+
+
+def roads_cache_path():
+    """
+    Cache file for roads sampled against the GDI grid.
+    
+    Keyed like the resampled LST cache: on the windowed GDI grid (the NDVI
+    window load_geotiff reads for DELHI_BOUNDS; header read only), the
+    bounds and the OSM road tags, so a different clip or road selection
+    never reuses stale samples.
+    """
+    with rasterio.open(NDVI_PATH) as src:
+        window = bounds_window(src, delhi_bbox())
+        key = repr((
+            src.crs.to_string(), repr(src.window_transform(window)),
+            int(window.width), int(window.height),
+            sorted(DELHI_BOUNDS.items()), sorted(ROAD_TAGS.items())
+        ))
+    digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+    return os.path.join(CACHE_DIR, f"roads_gdi_{digest}.gpkg")
+
+
+def roads_cache_valid(path, refresh=False):
+    """
+    Whether a sampled-roads cache file can be reused: it must be newer than
+    both input rasters and younger than ROADS_CACHE_MAX_AGE_DAYS (OSM keeps
+    changing). refresh=True always rejects it.
+    """
+    if refresh or not os.path.exists(path):
+        return False
+    mtime = os.path.getmtime(path)
+    return (
+        mtime > max(os.path.getmtime(NDVI_PATH), os.path.getmtime(LST_PATH))
+        and time.time() - mtime < ROADS_CACHE_MAX_AGE_DAYS * 86400
+    )
+
+
+def load_sampled_roads(gdi, profile, roads=None, refresh=False):
+    """
+    Roads with per-segment mean GDI ('raster_mean'), shared by figures 5 and 7.
+    
+    Reads the on-disk cache when still valid; otherwise fetches roads
+    (unless given), samples GDI along them and rewrites the cache.
+    
+    Args:
+        gdi (np.ndarray): Green Deficit Index raster
+        profile (RasterMeta): Metadata of the GDI grid
+        roads (GeoDataFrame): Preloaded road network (optional)
+        refresh (bool): Ignore the cache and re-fetch from OSM
+    
+    Returns:
+        roads_sampled (GeoDataFrame): geometry + 'raster_mean' in EPSG:4326
+    """
+    path = roads_cache_path()
+    if roads_cache_valid(path, refresh):
+        print(f"  ✓ Loaded sampled roads from cache: {path}")
+        return gpd.read_file(path)
+    
+    if roads is None:
+        roads = fetch_roads_delhi()
+    print("  ⏳ Sampling GDI along road network...")
+    roads_sampled = sample_raster_along_roads(roads, gdi, profile.transform)
+    
+    # Only geometry + GDI are used downstream; OSM tag columns (lists,
+    # mixed types) are dropped so the GeoPackage write stays simple
+    roads_sampled = roads_sampled[['raster_mean', 'geometry']]
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    roads_sampled.to_file(path, driver='GPKG')
+    print(f"  ✓ Cached sampled roads: {path}")
+    return roads_sampled
+
+
+def nan_percentile(arr, q):
+    """
+    np.nanpercentile (linear interpolation) via O(n) selection.
+    
+    Drops NaN with one mask and partitions around the two bracketing ranks,
+    instead of np.nanpercentile's generic NaN-aware path.
+    """
+    valid = arr[np.isfinite(arr)]
+    if valid.size == 0:
+        return np.nan
+    pos = (valid.size - 1) * q / 100
+    lo = int(pos)
+    hi = min(lo + 1, valid.size - 1)
+    part = np.partition(valid, (lo, hi))
+    return part[lo] + (part[hi] - part[lo]) * (pos - lo)
+
+
+# Basemap shared by all figures: (image, extent) once fetched, False if unavailable
+_basemap = None
+
+
+def get_basemap():
+    """
+    CartoDB Positron tiles for DELHI_BOUNDS, warped to EPSG:4326.
+    
+    Fetched once per process (tiles downloaded over a few parallel
+    connections); a failed fetch is remembered so offline runs don't retry
+    for every figure.
+    
+    Returns:
+        (image, extent) or None if the tiles could not be fetched
+    """
+    global _basemap
+    if _basemap is None:
+        import contextily as ctx
+        try:
+            img, ext = ctx.bounds2img(
+                DELHI_BOUNDS['west'], DELHI_BOUNDS['south'],
+                DELHI_BOUNDS['east'], DELHI_BOUNDS['north'],
+                zoom=11, source=ctx.providers.CartoDB.Positron,
+                ll=True, n_connections=4
+            )
+            _basemap = ctx.warp_tiles(img, ext, t_crs='EPSG:4326')
+        except Exception as e:
+            print(f"  ⚠️  Basemap unavailable: {e}")
+            _basemap = False
+    return _basemap or None
+
+
+def add_basemap(ax, alpha):
+    """
+    Draw the cached basemap on ax (like ctx.add_basemap, without refetching).
+    
+    Returns:
+        bool: False if no basemap is available
+    """
+    import contextily as ctx
+    
+    basemap = get_basemap()
+    if basemap is None:
+        return False
+    
+    image, extent = basemap
+    xmin, xmax, ymin, ymax = ax.axis()
+    ax.imshow(image, extent=extent, alpha=alpha, interpolation='bilinear',
+              aspect=ax.get_aspect())
+    ax.axis((xmin, xmax, ymin, ymax))
+    ctx.add_attribution(ax, ctx.providers.CartoDB.Positron.get('attribution'), font_size=8)
+    return True
+
+
+def new_map_panel(extent):
+    """
+    Figure + axes for unlabeled map panels covering extent (figure 7).
+    
+    The axes fill the whole figure and the figure is sized to the map's
+    display aspect (geopandas draws EPSG:4326 at 1/cos(lat)), so panels can
+    be saved as-is instead of through a bbox_inches='tight' pass. The figure
+    sits on its own Agg canvas (outside pyplot), so one figure can be
+    cleared and redrawn for every panel.
+    
+    Returns:
+        fig, ax, aspect (apply with ax.set_aspect after plotting)
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    
+    west, east, south, north = extent
+    aspect = 1 / math.cos(math.radians((south + north) / 2))
+    width = PANEL_HEIGHT * (east - west) / ((north - south) * aspect)
+    fig = Figure(figsize=(width, PANEL_HEIGHT), dpi=DPI)
+    FigureCanvasAgg(fig)
+    ax = fig.add_axes([0, 0, 1, 1])
+    return fig, ax, aspect
+
+
+def downsample_for_display(arr, target_px=DISPLAY_MAX_PX):
+    """
+    Strided view of a raster with at most target_px rows, for imshow.
+    
+    Agg resamples the whole array on every draw, so anything beyond ~2× the
+    output resolution is pure cost. Works on (H, W) and (H, W, C) arrays.
+    """
+    s = max(1, -(-arr.shape[0] // target_px))
+    return arr[::s, ::s]
+
+
+@functools.cache
+def get_priority_cmap():
+    """Priority colormap (see CMAP_PRIORITY_COLORS), built on first use."""
+    from matplotlib.colors import LinearSegmentedColormap
+    return LinearSegmentedColormap.from_list('priority', CMAP_PRIORITY_COLORS)
+
+
+@functools.cache
+def _colormap_lut(cmap_name):
+    """
+    Precomputed RGBA lookup for a colormap ('priority' or a Matplotlib name):
+    256 colour bins plus a transparent slot (index 256) for NaN/NoData.
+    """
+    import matplotlib
+    
+    cmap = get_priority_cmap() if cmap_name == 'priority' else matplotlib.colormaps[cmap_name]
+    lut = np.zeros((257, 4), dtype=np.uint8)
+    lut[:256] = (cmap(np.linspace(0, 1, 256)) * 255).astype(np.uint8)
+    return lut
+
+
+def colormap_to_rgba(values, cmap_name, vmin=0.0, vmax=1.0):
+    """
+    Colour a raster through a precomputed colormap LUT.
+    
+    Same bins as imshow(values, cmap=cmap_name, vmin=vmin, vmax=vmax), but a
+    single integer gather instead of Matplotlib's per-draw normalization, and
+    Agg then only copies a uint8 buffer.
+    
+    Args:
+        values (np.ndarray): Raster values (NaN = NoData)
+        cmap_name (str): 'priority' or a Matplotlib colormap name
+        vmin, vmax (float): Value range mapped onto the colormap
+    
+    Returns:
+        rgba (np.ndarray): (H, W, 4) uint8 image, NaN pixels transparent
+    """
+    idx = np.subtract(values, vmin, dtype=np.float32)
+    idx *= np.float32(256 / (vmax - vmin) if vmax > vmin else 0)  # Flat data → first bin
+    np.clip(idx, 0, 255, out=idx)
+    np.nan_to_num(idx, copy=False, nan=256)
+    return _colormap_lut(cmap_name)[idx.astype(np.uint16)]
+
+
+def priority_to_rgba(values):
+    """Colour a [0, 1] priority raster (NaN = NoData) through the priority LUT."""
+    return colormap_to_rgba(values, 'priority')
+
+
+def colormap_colorbar(ax, cmap_name, vmin=0.0, vmax=1.0, alpha=None, **kwargs):
+    """Colorbar for maps drawn with colormap_to_rgba (alpha as the image's, like plt.colorbar(im))."""
+    import matplotlib
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import Normalize
+    
+    cmap = get_priority_cmap() if cmap_name == 'priority' else matplotlib.colormaps[cmap_name]
+    mappable = plt.cm.ScalarMappable(norm=Normalize(vmin=vmin, vmax=vmax), cmap=cmap)
+    return plt.colorbar(mappable, ax=ax, alpha=alpha, **kwargs)
+
+
+def priority_colorbar(ax, **kwargs):
+    """Colorbar for the priority colormap over [0, 1], for maps drawn with priority_to_rgba."""
+    return colormap_colorbar(ax, 'priority', **kwargs)
+
+
+def load_all_inputs(fetch_roads=True):
+    """
+    Load NDVI, LST and the OSM road network concurrently.
+    
+    The OSM fetch is network-bound and the GeoTIFF reads are disk/decode
+    bound (rasterio releases the GIL), so they overlap in threads.
+    
+    Args:
+        fetch_roads (bool): Also fetch the road network
+    
+    Returns:
+        ndvi_data, ndvi_profile, lst_data, lst_profile, roads (None if not fetched)
+    """
+    with ThreadPoolExecutor(max_workers=3) as ex:
+        ndvi_f = ex.submit(load_geotiff, NDVI_PATH, delhi_bbox())
+        lst_f = ex.submit(load_geotiff, LST_PATH, delhi_bbox())
+        roads_f = ex.submit(fetch_roads_delhi) if fetch_roads else None
+        
+        ndvi_data, ndvi_profile = ndvi_f.result()
+        lst_data, lst_profile = lst_f.result()
+        roads = roads_f.result() if roads_f is not None else None
+    
+    return ndvi_data, ndvi_profile, lst_data, lst_profile, roads
+
+
 def add_scale_bar(ax, length_km=2, location='lower left', **kwargs):
     """
     Add a simple scale bar to a map axes.
@@ -349,6 +876,14 @@ def add_scale_bar(ax, length_km=2, location='lower left', **kwargs):
         pass
 
 
+def close_figure(fig):
+    """Close a figure and release its Agg buffers right away (keeps RSS flat across figures)."""
+    import matplotlib.pyplot as plt
+    
+    plt.close(fig)
+    gc.collect()
+
+
 def save_figure(fig, filename, dpi=DPI):
     """
     Save figure as high-resolution PNG.
@@ -359,7 +894,8 @@ def save_figure(fig, filename, dpi=DPI):
         dpi (int): Resolution in DPI
     """
     filepath = os.path.join(OUTPUT_DIR, filename)
-    fig.savefig(filepath, dpi=dpi, bbox_inches='tight', facecolor='white')
+    fig.savefig(filepath, dpi=dpi, bbox_inches='tight', facecolor='white',
+                pil_kwargs=PNG_SAVE_KWARGS)
     print(f"✓ Saved: {filepath}")
 
 
@@ -367,40 +903,38 @@ def save_figure(fig, filename, dpi=DPI):
 # VISUALIZATION FUNCTIONS
 # ============================================================================
 
-def figure_1_city_heat_context(lst_data, profile):
+def figure_1_city_heat_context(lst_data, profile, lst_norm=None):
     """
     Figure 1: City Heat Context
     
     Basemap with LST heatmap overlay.
     Purpose: "Delhi experiences uneven heat distribution"
     """
+    import matplotlib.pyplot as plt
+    
     print("📊 Generating Figure 1: City Heat Context...")
     
     fig, ax = plt.subplots(figsize=FIGSIZE_16_9, dpi=DPI)
     
-    # Normalize LST
-    lst_norm = normalize_array(lst_data, vmin=22, vmax=32)
+    # Normalize LST (unless precomputed)
+    if lst_norm is None:
+        lst_norm = normalize_array(lst_data, vmin=22, vmax=32)
     
-    # Plot LST heatmap
-    im = ax.imshow(
-        lst_norm,
-        cmap=CMAP_HEAT,
+    # Plot LST heatmap (pre-coloured over the displayed data range, as
+    # imshow's autoscaling would)
+    lst_display = downsample_for_display(lst_norm)
+    vmin, vmax = np.nanmin(lst_display), np.nanmax(lst_display)
+    ax.imshow(
+        colormap_to_rgba(lst_display, CMAP_HEAT, vmin, vmax),
         alpha=0.75,
         origin='upper',
+        interpolation='nearest',
         extent=[DELHI_BOUNDS['west'], DELHI_BOUNDS['east'], 
                 DELHI_BOUNDS['south'], DELHI_BOUNDS['north']]
     )
     
     # Add basemap context (if available)
-    try:
-        ctx.add_basemap(
-            ax,
-            crs='EPSG:4326',
-            source=ctx.providers.CartoDB.Positron,
-            zoom=11,
-            alpha=0.3
-        )
-    except Exception:
+    if not add_basemap(ax, alpha=0.3):
         ax.set_facecolor(BACKGROUND_COLOR)
     
     ax.set_xlim(DELHI_BOUNDS['west'], DELHI_BOUNDS['east'])
@@ -419,48 +953,46 @@ def figure_1_city_heat_context(lst_data, profile):
     )
     
     # Simple colorbar (minimal style)
-    cbar = plt.colorbar(im, ax=ax, fraction=0.046, pad=0.04)
+    cbar = colormap_colorbar(ax, CMAP_HEAT, vmin, vmax, alpha=0.75, fraction=0.046, pad=0.04)
     cbar.set_label('Surface Temperature (°C)', fontsize=12, color=TEXT_COLOR)
     cbar.ax.tick_params(labelsize=10, colors=TEXT_COLOR)
     
     save_figure(fig, '01_city_heat_context.png')
-    plt.close(fig)
+    close_figure(fig)
 
 
-def figure_2_green_cover_distribution(ndvi_data, profile):
+def figure_2_green_cover_distribution(ndvi_data, profile, ndvi_norm=None):
     """
     Figure 2: Green Cover Distribution
     
     NDVI visualization with green emphasis.
     Purpose: "Green spaces exist, but are unevenly distributed"
     """
+    import matplotlib.pyplot as plt
+    
     print("📊 Generating Figure 2: Green Cover Distribution...")
     
     fig, ax = plt.subplots(figsize=FIGSIZE_16_9, dpi=DPI)
     
-    # Normalize NDVI
-    ndvi_norm = normalize_array(ndvi_data, vmin=-0.2, vmax=0.8)
+    # Normalize NDVI (unless precomputed)
+    if ndvi_norm is None:
+        ndvi_norm = normalize_array(ndvi_data, vmin=-0.2, vmax=0.8)
     
-    # Plot NDVI with green colormap
-    im = ax.imshow(
-        ndvi_norm,
-        cmap=CMAP_NDVI,
+    # Plot NDVI with green colormap (pre-coloured over the displayed data
+    # range, as imshow's autoscaling would)
+    ndvi_display = downsample_for_display(ndvi_norm)
+    vmin, vmax = np.nanmin(ndvi_display), np.nanmax(ndvi_display)
+    ax.imshow(
+        colormap_to_rgba(ndvi_display, CMAP_NDVI, vmin, vmax),
         alpha=0.85,
         origin='upper',
+        interpolation='nearest',
         extent=[DELHI_BOUNDS['west'], DELHI_BOUNDS['east'], 
                 DELHI_BOUNDS['south'], DELHI_BOUNDS['north']]
     )
     
     # Add subtle basemap
-    try:
-        ctx.add_basemap(
-            ax,
-            crs='EPSG:4326',
-            source=ctx.providers.CartoDB.Positron,
-            zoom=11,
-            alpha=0.2
-        )
-    except Exception:
+    if not add_basemap(ax, alpha=0.2):
         ax.set_facecolor(BACKGROUND_COLOR)
     
     ax.set_xlim(DELHI_BOUNDS['west'], DELHI_BOUNDS['east'])
@@ -479,56 +1011,54 @@ def figure_2_green_cover_distribution(ndvi_data, profile):
     )
     
     # Colorbar
-    cbar = plt.colorbar(im, ax=ax, fraction=0.046, pad=0.04)
+    cbar = colormap_colorbar(ax, CMAP_NDVI, vmin, vmax, alpha=0.85, fraction=0.046, pad=0.04)
     cbar.set_label('NDVI Index', fontsize=12, color=TEXT_COLOR)
     cbar.ax.tick_params(labelsize=10, colors=TEXT_COLOR)
     
     save_figure(fig, '02_green_cover_distribution.png')
-    plt.close(fig)
+    close_figure(fig)
 
 
-def figure_3_heat_vs_green_overlay(ndvi_data, lst_data, profile):
+def figure_3_heat_vs_green_overlay(ndvi_data, lst_data, profile, ndvi_norm=None, lst_norm=None):
     """
     Figure 3: Heat vs Green Overlay
     
     NDVI (green) + LST (red/orange) with balanced alpha blending.
     Purpose: "Hot areas often coincide with low greenery"
     """
+    import matplotlib.pyplot as plt
+    import matplotlib.patches as mpatches
+    
     print("📊 Generating Figure 3: Heat vs Green Overlay...")
     
     fig, ax = plt.subplots(figsize=FIGSIZE_16_9, dpi=DPI)
     
-    # Normalize inputs
-    ndvi_norm = normalize_array(ndvi_data, vmin=-0.2, vmax=0.8)
-    lst_norm = normalize_array(lst_data, vmin=22, vmax=32)
+    # Normalize inputs (unless precomputed)
+    if ndvi_norm is None:
+        ndvi_norm = normalize_array(ndvi_data, vmin=-0.2, vmax=0.8)
+    if lst_norm is None:
+        lst_norm = normalize_array(lst_data, vmin=22, vmax=32)
     
     # Create composite RGB image
     # Red channel = LST (heat), Green channel = NDVI, Blue channel = neutral
-    composite = np.stack([
-        lst_norm,      # Red = heat
-        ndvi_norm,     # Green = vegetation
-        0.5 * np.ones_like(lst_norm)  # Blue = neutral
-    ], axis=-1)
+    # (filled in place: no stacking copy, no ones_like temporary, float32)
+    composite = np.empty(lst_norm.shape + (3,), dtype=np.float32)
+    composite[..., 0] = lst_norm   # Red = heat
+    composite[..., 1] = ndvi_norm  # Green = vegetation
+    composite[..., 2] = 0.5        # Blue = neutral
     
     # Plot composite
     ax.imshow(
-        composite, 
+        downsample_for_display(composite), 
         alpha=0.8, 
         origin='upper',
+        interpolation='nearest',
         extent=[DELHI_BOUNDS['west'], DELHI_BOUNDS['east'], 
                 DELHI_BOUNDS['south'], DELHI_BOUNDS['north']]
     )
     
     # Add basemap
-    try:
-        ctx.add_basemap(
-            ax,
-            crs='EPSG:4326',
-            source=ctx.providers.CartoDB.Positron,
-            zoom=11,
-            alpha=0.25
-        )
-    except Exception:
+    if not add_basemap(ax, alpha=0.25):
         ax.set_facecolor(BACKGROUND_COLOR)
     
     ax.set_xlim(DELHI_BOUNDS['west'], DELHI_BOUNDS['east'])
@@ -557,10 +1087,10 @@ def figure_3_heat_vs_green_overlay(ndvi_data, lst_data, profile):
     )
     
     save_figure(fig, '03_heat_vs_green_overlay.png')
-    plt.close(fig)
+    close_figure(fig)
 
 
-def figure_4_green_deficit_index(ndvi_data, lst_data, profile):
+def figure_4_green_deficit_index(ndvi_data, lst_data, profile, gdi=None):
     """
     Figure 4: Green Deficit Index (Derived Layer)
     
@@ -568,34 +1098,28 @@ def figure_4_green_deficit_index(ndvi_data, lst_data, profile):
     Red = high priority, Green = low priority
     Purpose: "A single interpretable planning metric"
     """
+    import matplotlib.pyplot as plt
+    
     print("📊 Generating Figure 4: Green Deficit Index...")
     
-    # Compute GDI
-    gdi = compute_green_deficit_index(ndvi_data, lst_data)
+    # Compute GDI (unless precomputed)
+    if gdi is None:
+        gdi = compute_green_deficit_index(ndvi_data, lst_data)
     
     fig, ax = plt.subplots(figsize=FIGSIZE_16_9, dpi=DPI)
     
     # Plot GDI with priority colormap
-    im = ax.imshow(
-        gdi,
-        cmap=CMAP_PRIORITY,
-        vmin=0, vmax=1,
+    ax.imshow(
+        priority_to_rgba(downsample_for_display(gdi)),
         alpha=0.85,
         origin='upper',
+        interpolation='nearest',
         extent=[DELHI_BOUNDS['west'], DELHI_BOUNDS['east'], 
                 DELHI_BOUNDS['south'], DELHI_BOUNDS['north']]
     )
     
     # Add basemap
-    try:
-        ctx.add_basemap(
-            ax,
-            crs='EPSG:4326',
-            source=ctx.providers.CartoDB.Positron,
-            zoom=11,
-            alpha=0.25
-        )
-    except Exception:
+    if not add_basemap(ax, alpha=0.25):
         ax.set_facecolor(BACKGROUND_COLOR)
     
     ax.set_xlim(DELHI_BOUNDS['west'], DELHI_BOUNDS['east'])
@@ -614,67 +1138,63 @@ def figure_4_green_deficit_index(ndvi_data, lst_data, profile):
     )
     
     # Colorbar with semantic labels
-    cbar = plt.colorbar(im, ax=ax, fraction=0.046, pad=0.04)
+    cbar = priority_colorbar(ax, alpha=0.85, fraction=0.046, pad=0.04)
     cbar.set_label('Priority (Low ← → High)', fontsize=12, color=TEXT_COLOR)
     cbar.ax.tick_params(labelsize=10, colors=TEXT_COLOR)
     
     save_figure(fig, '04_green_deficit_index.png')
-    plt.close(fig)
+    close_figure(fig)
     
     return gdi
 
 
-def figure_5_street_level_priority_map(ndvi_data, lst_data, profile):
+def figure_5_street_level_priority_map(ndvi_data, lst_data, profile, roads=None, gdi=None,
+                                       roads_sampled=None):
     """
     Figure 5: Street-Level Priority Map
     
     Road network overlaid on GDI, colored by mean GDI values.
     Purpose: "We translate satellite data into actionable streets"
     """
+    import matplotlib.pyplot as plt
+    
     print("📊 Generating Figure 5: Street-Level Priority Map...")
     
-    # Compute GDI
-    gdi = compute_green_deficit_index(ndvi_data, lst_data)
+    # Compute GDI (unless precomputed)
+    if gdi is None:
+        gdi = compute_green_deficit_index(ndvi_data, lst_data)
     
-    # Fetch roads
-    roads = fetch_roads_delhi()
+    # Fetch roads (unless preloaded or already sampled)
+    if roads is None and roads_sampled is None:
+        roads = fetch_roads_delhi()
     
     fig, ax = plt.subplots(figsize=FIGSIZE_16_9, dpi=DPI)
     
     # Plot GDI as background
-    im = ax.imshow(
-        gdi,
-        cmap=CMAP_PRIORITY,
-        vmin=0, vmax=1,
+    ax.imshow(
+        priority_to_rgba(downsample_for_display(gdi)),
         alpha=0.6,
         origin='upper',
+        interpolation='nearest',
         extent=[DELHI_BOUNDS['west'], DELHI_BOUNDS['east'], 
                 DELHI_BOUNDS['south'], DELHI_BOUNDS['north']]
     )
     
     # Add basemap
-    try:
-        ctx.add_basemap(
-            ax,
-            crs='EPSG:4326',
-            source=ctx.providers.CartoDB.Positron,
-            zoom=11,
-            alpha=0.2
-        )
-    except Exception:
-        pass
+    add_basemap(ax, alpha=0.2)
     
-    # Sample GDI values along roads
-    print("  ⏳ Sampling GDI values along road network...")
-    roads = sample_raster_along_roads(roads, gdi, profile['transform'])
+    # Sample GDI values along roads (unless done by the caller)
+    if roads_sampled is None:
+        print("  ⏳ Sampling GDI values along road network...")
+        roads_sampled = sample_raster_along_roads(roads, gdi, profile.transform)
     
     # Plot roads colored by their mean GDI value
-    roads_valid = roads[roads['raster_mean'].notna()].copy()
+    roads_valid = roads_sampled[roads_sampled['raster_mean'].notna()].copy()
     if len(roads_valid) > 0:
         roads_valid.plot(
             ax=ax,
             column='raster_mean',
-            cmap=CMAP_PRIORITY,
+            cmap=get_priority_cmap(),
             linewidth=1.5,
             alpha=0.85,
             legend=False
@@ -699,70 +1219,62 @@ def figure_5_street_level_priority_map(ndvi_data, lst_data, profile):
     )
     
     # Colorbar
-    cbar = plt.colorbar(im, ax=ax, fraction=0.046, pad=0.04)
+    cbar = priority_colorbar(ax, alpha=0.6, fraction=0.046, pad=0.04)
     cbar.set_label('Priority Index', fontsize=12, color=TEXT_COLOR)
     
     save_figure(fig, '05_street_level_priority_map.png')
-    plt.close(fig)
+    close_figure(fig)
 
 
-def figure_6_example_green_corridor(ndvi_data, lst_data, profile):
+def figure_6_example_green_corridor(ndvi_data, lst_data, profile, gdi=None):
     """
     Figure 6: Example VanSetu Corridor
     
     Highlight a single high-priority corridor; mute everything else.
     Purpose: "This is how intervention would be targeted"
     """
+    import matplotlib.pyplot as plt
+    
     print("📊 Generating Figure 6: Example VanSetu Corridor...")
     
-    # Compute GDI
-    gdi = compute_green_deficit_index(ndvi_data, lst_data)
+    # Compute GDI (unless precomputed)
+    if gdi is None:
+        gdi = compute_green_deficit_index(ndvi_data, lst_data)
     
-    # Create background (muted)
-    background = np.ones_like(gdi) * 0.8  # Light gray
+    # Create background (muted), at display resolution
+    background = np.full(downsample_for_display(gdi).shape, 0.8, dtype=np.float32)  # Light gray
     
     # Identify high-priority corridor (top 15% of GDI)
-    threshold = np.nanpercentile(gdi, 85)
+    threshold = nan_percentile(gdi, 85)
     corridor_mask = gdi > threshold
     
     # Create emphasized layer
-    emphasized = np.where(corridor_mask, gdi, np.nan)
+    emphasized = np.where(corridor_mask, gdi, np.float32(np.nan))
     
     fig, ax = plt.subplots(figsize=FIGSIZE_16_9, dpi=DPI)
     
     # Plot muted background
     ax.imshow(
-        background, 
-        cmap='Greys', 
-        vmin=0, vmax=1, 
+        colormap_to_rgba(background, 'Greys'), 
         alpha=0.5, 
         origin='upper',
+        interpolation='nearest',
         extent=[DELHI_BOUNDS['west'], DELHI_BOUNDS['east'], 
                 DELHI_BOUNDS['south'], DELHI_BOUNDS['north']]
     )
     
     # Plot high-priority corridor
-    im = ax.imshow(
-        emphasized, 
-        cmap=CMAP_PRIORITY, 
-        vmin=0, vmax=1, 
+    ax.imshow(
+        priority_to_rgba(downsample_for_display(emphasized)), 
         alpha=0.9, 
         origin='upper',
+        interpolation='nearest',
         extent=[DELHI_BOUNDS['west'], DELHI_BOUNDS['east'], 
                 DELHI_BOUNDS['south'], DELHI_BOUNDS['north']]
     )
     
     # Add basemap
-    try:
-        ctx.add_basemap(
-            ax,
-            crs='EPSG:4326',
-            source=ctx.providers.CartoDB.Positron,
-            zoom=11,
-            alpha=0.15
-        )
-    except Exception:
-        pass
+    add_basemap(ax, alpha=0.15)
     
     ax.set_xlim(DELHI_BOUNDS['west'], DELHI_BOUNDS['east'])
     ax.set_ylim(DELHI_BOUNDS['south'], DELHI_BOUNDS['north'])
@@ -792,14 +1304,15 @@ def figure_6_example_green_corridor(ndvi_data, lst_data, profile):
     )
     
     # Colorbar
-    cbar = plt.colorbar(im, ax=ax, fraction=0.046, pad=0.04)
+    cbar = priority_colorbar(ax, alpha=0.9, fraction=0.046, pad=0.04)
     cbar.set_label('Priority Index', fontsize=12, color=TEXT_COLOR)
     
     save_figure(fig, '06_example_green_corridor.png')
-    plt.close(fig)
+    close_figure(fig)
 
 
-def figure_7_continuous_map_story(ndvi_data, lst_data, profile):
+def figure_7_continuous_map_story(ndvi_data, lst_data, profile, roads=None, gdi=None,
+                                  roads_sampled=None):
     """
     Figure 7: Continuous Map Story — Three Separate Panel Images
     
@@ -811,18 +1324,25 @@ def figure_7_continuous_map_story(ndvi_data, lst_data, profile):
     All panels share identical geographic extent for visual continuity.
     No titles, labels, padding, or text — pure map content only.
     """
+    from matplotlib.collections import LineCollection
+    
     print("📊 Generating Figure 7: Continuous Map Story (3 separate panels)...")
     
-    # Compute Green Deficit Index
-    gdi = compute_green_deficit_index(ndvi_data, lst_data)
+    # Compute Green Deficit Index (unless precomputed)
+    if gdi is None:
+        gdi = compute_green_deficit_index(ndvi_data, lst_data)
     
-    # Fetch road network
-    print("  ⏳ Fetching road network...")
-    roads = fetch_roads_delhi()
+    # Fetch road network (unless preloaded or already sampled)
+    if roads is None and roads_sampled is None:
+        print("  ⏳ Fetching road network...")
+        roads = fetch_roads_delhi()
     
-    # Sample GDI values along roads for corridor selection
-    print("  ⏳ Sampling GDI along roads for corridor identification...")
-    roads_sampled = sample_raster_along_roads(roads.copy(), gdi, profile['transform'])
+    # Sample GDI values along roads for corridor selection (unless done by the caller)
+    if roads_sampled is None:
+        print("  ⏳ Sampling GDI along roads for corridor identification...")
+        roads_sampled = sample_raster_along_roads(roads, gdi, profile.transform)
+    if roads is None:
+        roads = roads_sampled
     
     # Filter to roads with valid GDI samples
     roads_valid = roads_sampled[roads_sampled['raster_mean'].notna()].copy()
@@ -834,87 +1354,96 @@ def figure_7_continuous_map_story(ndvi_data, lst_data, profile):
     else:
         corridor_display = gpd.GeoDataFrame(geometry=[], crs='EPSG:4326')
     
-    # Shared extent
+    # Shared extent, and one figure/canvas reused for all three panels
     extent = [DELHI_BOUNDS['west'], DELHI_BOUNDS['east'], 
               DELHI_BOUNDS['south'], DELHI_BOUNDS['north']]
+    fig, ax, aspect = new_map_panel(extent)
     
     # -------------------------------------------------------------------------
     # PANEL 1: "The City As It Is" — Roads only
     # -------------------------------------------------------------------------
     print("  📍 Generating Panel 1: The City Today...")
-    fig1, ax1 = plt.subplots(figsize=FIGSIZE_16_9, dpi=DPI)
-    
     # White/light gray background
-    ax1.set_facecolor('#f0f0f0')
+    ax.set_facecolor('#f0f0f0')
     
     # Road network
     if len(roads) > 0:
-        roads.plot(ax=ax1, color='#4a4a4a', linewidth=0.6, alpha=0.7)
+        roads.plot(ax=ax, color='#4a4a4a', linewidth=0.6, alpha=0.7)
     
-    ax1.set_xlim(extent[0], extent[1])
-    ax1.set_ylim(extent[2], extent[3])
-    ax1.axis('off')
-    fig1.patch.set_facecolor('#f0f0f0')
+    ax.set_aspect(aspect)
+    ax.set_xlim(extent[0], extent[1])
+    ax.set_ylim(extent[2], extent[3])
+    ax.axis('off')
+    fig.patch.set_facecolor('#f0f0f0')
     
-    # Save tightly cropped
+    # Axes fill the figure, so the map is already cropped
     filepath1 = os.path.join(OUTPUT_DIR, '07a_city_today.png')
-    fig1.savefig(filepath1, dpi=DPI, bbox_inches='tight', pad_inches=0)
+    fig.savefig(filepath1, dpi=DPI, pil_kwargs=PNG_SAVE_KWARGS)
     print(f"  ✓ Saved: {filepath1}")
-    plt.close(fig1)
     
     # -------------------------------------------------------------------------
     # PANEL 2: "Where the City Suffers" — GDI overlay
     # -------------------------------------------------------------------------
     print("  📍 Generating Panel 2: Priority Zones...")
-    fig2, ax2 = plt.subplots(figsize=FIGSIZE_16_9, dpi=DPI)
+    ax.clear()
     
     # GDI overlay
-    ax2.imshow(gdi, cmap=CMAP_PRIORITY, vmin=0, vmax=1, alpha=0.85, origin='upper', extent=extent)
+    ax.imshow(priority_to_rgba(downsample_for_display(gdi)), alpha=0.85, origin='upper',
+               interpolation='nearest', extent=extent)
     
     # Faint roads
     if len(roads) > 0:
-        roads.plot(ax=ax2, color='#333333', linewidth=0.3, alpha=0.25)
+        roads.plot(ax=ax, color='#333333', linewidth=0.3, alpha=0.25)
     
-    ax2.set_xlim(extent[0], extent[1])
-    ax2.set_ylim(extent[2], extent[3])
-    ax2.axis('off')
-    fig2.patch.set_facecolor('white')
+    ax.set_aspect(aspect)
+    ax.set_xlim(extent[0], extent[1])
+    ax.set_ylim(extent[2], extent[3])
+    ax.axis('off')
+    fig.patch.set_facecolor('white')
     
     filepath2 = os.path.join(OUTPUT_DIR, '07b_priority_zones.png')
-    fig2.savefig(filepath2, dpi=DPI, bbox_inches='tight', pad_inches=0)
+    fig.savefig(filepath2, dpi=DPI, pil_kwargs=PNG_SAVE_KWARGS)
     print(f"  ✓ Saved: {filepath2}")
-    plt.close(fig2)
     
     # -------------------------------------------------------------------------
     # PANEL 3: "What We Can Do" — VanSetu corridors
     # -------------------------------------------------------------------------
     print("  📍 Generating Panel 3: VanSetu Corridor Vision...")
-    fig3, ax3 = plt.subplots(figsize=FIGSIZE_16_9, dpi=DPI)
+    ax.clear()
     
     # Muted GDI background
-    ax3.imshow(gdi, cmap='Greys', vmin=0, vmax=1, alpha=0.15, origin='upper', extent=extent)
+    ax.imshow(colormap_to_rgba(downsample_for_display(gdi), 'Greys'), alpha=0.15,
+               origin='upper', interpolation='nearest', extent=extent)
     
     # Faint roads
     if len(roads) > 0:
-        roads.plot(ax=ax3, color='#888888', linewidth=0.3, alpha=0.3)
+        roads.plot(ax=ax, color='#888888', linewidth=0.3, alpha=0.3)
     
-    # VanSetu corridors
+    # VanSetu corridors: a wide translucent stroke (the ~0.005° glow, no GEOS
+    # buffer) under the corridor line, both as plain line collections
     if len(corridor_display) > 0:
-        corridor_buffer = corridor_display.copy()
-        corridor_buffer['geometry'] = corridor_buffer.geometry.buffer(0.005)
-        corridor_buffer.plot(ax=ax3, color='#2ecc71', alpha=0.3, edgecolor='none')
-        corridor_display.plot(ax=ax3, color='#27ae60', linewidth=2.5, alpha=0.9)
+        parts = shapely.get_parts(corridor_display.geometry.values)
+        coords, part_ids = shapely.get_coordinates(parts, return_index=True)
+        segments = np.split(coords, np.flatnonzero(np.diff(part_ids)) + 1)
+        glow_width = 2 * 0.005 / (extent[1] - extent[0]) * fig.get_figwidth() * 72  # points
+        ax.add_collection(LineCollection(
+            segments, colors='#2ecc71', linewidths=glow_width, alpha=0.3,
+            capstyle='round', joinstyle='round'
+        ))
+        ax.add_collection(LineCollection(
+            segments, colors='#27ae60', linewidths=2.5, alpha=0.9
+        ))
         print(f"  ✓ Rendered {len(corridor_display)} VanSetu corridor segments")
     
-    ax3.set_xlim(extent[0], extent[1])
-    ax3.set_ylim(extent[2], extent[3])
-    ax3.axis('off')
-    fig3.patch.set_facecolor('white')
+    ax.set_aspect(aspect)
+    ax.set_xlim(extent[0], extent[1])
+    ax.set_ylim(extent[2], extent[3])
+    ax.axis('off')
+    fig.patch.set_facecolor('white')
     
     filepath3 = os.path.join(OUTPUT_DIR, '07c_green_corridors.png')
-    fig3.savefig(filepath3, dpi=DPI, bbox_inches='tight', pad_inches=0)
+    fig.savefig(filepath3, dpi=DPI, pil_kwargs=PNG_SAVE_KWARGS)
     print(f"  ✓ Saved: {filepath3}")
-    plt.close(fig3)
     
     print("  ✓ Three-panel narrative visualization complete (3 separate files)")
 
@@ -987,6 +1516,8 @@ def run_preflight_checks():
     Raises:
         RuntimeError: If any check fails
     """
+    import osmnx as ox
+    
     print("\n🔍 Running preflight checks...")
     
     # Check required files exist
@@ -995,15 +1526,16 @@ def run_preflight_checks():
             raise FileNotFoundError(f"{description} not found: {filepath}")
         print(f"  ✓ Found: {filepath}")
     
-    # Test OSMnx connectivity with a small query
+    # Test connectivity to the Overpass endpoint OSMnx uses (TCP only, no
+    # rate-limited query)
     print("  ⏳ Testing OSMnx connectivity...")
+    url = urllib.parse.urlsplit(ox.settings.overpass_url)
+    host, port = url.hostname, url.port or (443 if url.scheme == 'https' else 80)
     try:
-        # Small test query
-        test_bbox = (77.0, 28.5, 77.1, 28.6)  # Small area in Delhi
-        test_tags = {'highway': 'primary'}
-        test_result = ox.features_from_bbox(bbox=test_bbox, tags=test_tags)
-        print(f"  ✓ OSMnx connection OK (test returned {len(test_result)} features)")
-    except Exception as e:
+        with socket.create_connection((host, port), timeout=5):
+            pass
+        print(f"  ✓ OSMnx connection OK ({host}:{port} reachable)")
+    except OSError as e:
         raise RuntimeError(f"OSMnx connectivity test failed: {e}")
     
     print("✓ All preflight checks passed!\n")
@@ -1013,6 +1545,33 @@ def run_preflight_checks():
 # MAIN ENTRY POINT
 # ============================================================================
 
+# Figure number → generator, called with the dict of shared inputs built in main()
+FIGURE_GENERATORS = {
+    1: lambda d: figure_1_city_heat_context(d['lst_data'], d['profile'], lst_norm=d['lst_norm']),
+    2: lambda d: figure_2_green_cover_distribution(d['ndvi_data'], d['profile'],
+                                                   ndvi_norm=d['ndvi_norm']),
+    3: lambda d: figure_3_heat_vs_green_overlay(d['ndvi_data'], d['lst_data'], d['profile'],
+                                                ndvi_norm=d['ndvi_norm'], lst_norm=d['lst_norm']),
+    4: lambda d: figure_4_green_deficit_index(d['ndvi_data'], d['lst_data'], d['profile'],
+                                              gdi=d['gdi']),
+    5: lambda d: figure_5_street_level_priority_map(d['ndvi_data'], d['lst_data'], d['profile'],
+                                                    d['roads'], gdi=d['gdi'],
+                                                    roads_sampled=d['roads_sampled']),
+    6: lambda d: figure_6_example_green_corridor(d['ndvi_data'], d['lst_data'], d['profile'],
+                                                 gdi=d['gdi']),
+    7: lambda d: figure_7_continuous_map_story(d['ndvi_data'], d['lst_data'], d['profile'],
+                                               d['roads'], gdi=d['gdi'],
+                                               roads_sampled=d['roads_sampled']),
+}
+
+
+def configure_matplotlib():
+    """Headless Agg backend, with long road paths rendered in chunks."""
+    import matplotlib
+    matplotlib.use('Agg')
+    matplotlib.rcParams['agg.path.chunksize'] = 10000
+
+
 def print_usage():
     """Print command-line usage information."""
     usage = """
@@ -1034,6 +1593,7 @@ FIGURES:
 OPTIONS:
   -h, --help     Show this help message
   --skip-osm     Skip OSMnx preflight check (faster startup)
+  --refresh-roads  Re-fetch the OSM road network instead of using the cache
   --list         List available figures and exit
 
 EXAMPLES:
@@ -1042,6 +1602,7 @@ EXAMPLES:
   python main.py 7            # Generate only the 3-panel narrative
   python main.py 4 5 6        # Generate figures 4, 5, and 6
   python main.py --skip-osm 1 2 3 4  # Skip OSM check, generate 1-4
+  python main.py --refresh-roads 5   # Re-fetch roads from OSM, generate 5
 """
     print(usage)
 
@@ -1053,6 +1614,7 @@ def parse_arguments():
     Returns:
         figures (list): List of figure numbers to generate (1-6)
         skip_osm (bool): Whether to skip OSMnx preflight check
+        refresh_roads (bool): Whether to bypass the sampled-roads cache
     """
     args = sys.argv[1:]
     
@@ -1078,6 +1640,11 @@ def parse_arguments():
     if skip_osm:
         args.remove('--skip-osm')
     
+    # Check for refresh-roads flag
+    refresh_roads = '--refresh-roads' in args
+    if refresh_roads:
+        args.remove('--refresh-roads')
+    
     # Parse figure numbers
     figures = []
     for arg in args:
@@ -1094,7 +1661,7 @@ def parse_arguments():
     if not figures:
         figures = [1, 2, 3, 4, 5, 6, 7]
     
-    return sorted(set(figures)), skip_osm
+    return sorted(set(figures)), skip_osm, refresh_roads
 
 
 def main():
@@ -1103,7 +1670,7 @@ def main():
     Orchestrates data loading, validation, and figure generation.
     """
     # Parse command-line arguments
-    figures_to_generate, skip_osm = parse_arguments()
+    figures_to_generate, skip_osm, refresh_roads = parse_arguments()
     
     print("=" * 80)
     print("VanSetu Platform — Visualization Generator")
@@ -1124,10 +1691,12 @@ def main():
     else:
         run_preflight_checks()
     
-    # Load data
+    # Load data (roads only if a figure needs them and they aren't cached)
     print("📂 Loading GeoTIFFs...")
-    ndvi_data, ndvi_profile = load_geotiff(NDVI_PATH)
-    lst_data_orig, lst_profile = load_geotiff(LST_PATH)
+    needs_roads = any(n in figures_to_generate for n in (5, 7))
+    ndvi_data, ndvi_profile, lst_data_orig, lst_profile, roads = load_all_inputs(
+        fetch_roads=needs_roads and not roads_cache_valid(roads_cache_path(), refresh_roads)
+    )
     
     # Validate loaded data
     print("\n🔍 Validating raster data...")
@@ -1136,32 +1705,44 @@ def main():
     
     # Resample LST to match NDVI resolution (LST is coarser, so upsample)
     print("\n⚙️  Resampling LST to match NDVI resolution...")
-    lst_data = resample_raster_to_match(lst_data_orig, lst_profile, ndvi_data, ndvi_profile)
+    lst_data = load_resampled_lst(lst_data_orig, lst_profile, ndvi_data, ndvi_profile)
     print(f"  ✓ LST resampled from {lst_data_orig.shape} to {lst_data.shape}")
     validate_raster_data(lst_data, "LST (resampled)", expected_range=(15, 50))
     
+    # Everything downstream assumes float32 rasters (no-op when already so)
+    ndvi_data = ndvi_data.astype(np.float32, copy=False)
+    lst_data = lst_data.astype(np.float32, copy=False)
+    
     # Use NDVI profile as reference (both now match)
     profile = ndvi_profile
     
+    # Normalized NDVI/LST (figures 1–3) and GDI (figures 4–7) in one fused pass
+    ndvi_norm, lst_norm, gdi = compute_norms_and_gdi(ndvi_data, lst_data)
+    
+    # Roads + their GDI samples are shared by figures 5 and 7
+    roads_sampled = (
+        load_sampled_roads(gdi, profile, roads, refresh_roads) if needs_roads else None
+    )
+    
     # Generate selected figures
     print("\n" + "=" * 80)
     print("GENERATING VISUALIZATIONS")
     print("=" * 80 + "\n")
     
-    # Map figure numbers to generator functions
-    figure_generators = {
-        1: lambda: figure_1_city_heat_context(lst_data, profile),
-        2: lambda: figure_2_green_cover_distribution(ndvi_data, profile),
-        3: lambda: figure_3_heat_vs_green_overlay(ndvi_data, lst_data, profile),
-        4: lambda: figure_4_green_deficit_index(ndvi_data, lst_data, profile),
-        5: lambda: figure_5_street_level_priority_map(ndvi_data, lst_data, profile),
-        6: lambda: figure_6_example_green_corridor(ndvi_data, lst_data, profile),
-        7: lambda: figure_7_continuous_map_story(ndvi_data, lst_data, profile),
+    # Inputs shared by all figure generators
+    inputs = {
+        'ndvi_data': ndvi_data, 'lst_data': lst_data, 'profile': profile,
+        'ndvi_norm': ndvi_norm, 'lst_norm': lst_norm, 'gdi': gdi,
+        'roads': roads, 'roads_sampled': roads_sampled,
     }
     
-    # Generate each selected figure
+    # Fetch basemap tiles once, up front (figures 1–6 use them)
+    if any(n <= 6 for n in figures_to_generate):
+        get_basemap()
+    
+    configure_matplotlib()
     for fig_num in figures_to_generate:
-        figure_generators[fig_num]()
+        FIGURE_GENERATORS[fig_num](inputs)
     
     # Summary
     print("\n" + "=" * 80)
@@ -0,0 +1,271 @@
+"""
+Visualization Pipeline Tests — Verify the raster math behind the figures.
+
+Run with: pytest tests/test_main.py -v
+"""
+import os
+import sys
+import time
+
+import geopandas as gpd
+import numpy as np
+import pytest
+from shapely.geometry import LineString
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+from rasterio.windows import Window
+
+
+def reference_normalize(arr, vmin=None, vmax=None):
+    """The original masked normalize_array, for equivalence checks."""
+    valid_mask = np.isfinite(arr)
+    if vmin is None:
+        vmin = np.nanmin(arr[valid_mask]) if np.any(valid_mask) else 0
+    if vmax is None:
+        vmax = np.nanmax(arr[valid_mask]) if np.any(valid_mask) else 1
+    normalized = np.zeros_like(arr, dtype=np.float32)
+    normalized[valid_mask] = (arr[valid_mask] - vmin) / (vmax - vmin + 1e-8)
+    normalized[~valid_mask] = np.nan
+    return np.clip(normalized, 0, 1)
+
+
+def reference_gdi(ndvi, lst):
+    """The original GDI formula on masked normalized rasters."""
+    ndvi_norm = reference_normalize(ndvi, -0.2, 0.8)
+    lst_norm = reference_normalize(lst, 22, 32)
+    return ndvi_norm, lst_norm, lst_norm * 0.6 + (1 - ndvi_norm) * 0.4
+
+
+class InverseTransform:
+    """
+    Stand-in for a rasterio Affine: sample_raster_along_roads only uses
+    ~transform and its a–f coefficients, given here as the inverse.
+    """
+    
+    def __init__(self, a, b, c, d, e, f):
+        self.a, self.b, self.c, self.d, self.e, self.f = a, b, c, d, e, f
+    
+    def __invert__(self):
+        return self
+
+
+@pytest.fixture(params=[True, False], ids=["numba", "numpy"])
+def kernel_path(request, monkeypatch):
+    """Run a test on the Numba kernels and again on the NumPy fallback."""
+    if request.param and not main.HAS_NUMBA:
+        pytest.skip("numba not installed")
+    monkeypatch.setattr(main, "HAS_NUMBA", request.param)
+    return request.param
+
+
+class TestNormalizeArray:
+    """Test raster normalization."""
+    
+    def test_matches_masked_reference(self):
+        """Auto and fixed bounds agree with the original masked version."""
+        rng = np.random.default_rng(0)
+        arr = rng.uniform(-0.5, 1.0, (50, 60)).astype(np.float32)
+        arr[::7, ::3] = np.nan
+        
+        np.testing.assert_allclose(main.normalize_array(arr), reference_normalize(arr), atol=1e-6)
+        np.testing.assert_allclose(
+            main.normalize_array(arr, -0.2, 0.8), reference_normalize(arr, -0.2, 0.8), atol=1e-6
+        )
+    
+    def test_flat_array_is_zero(self):
+        """Flat data (vmin == vmax) normalizes to 0, not NaN."""
+        for dtype in (np.float32, np.float64):
+            result = main.normalize_array(np.full((3, 4), 27.5, dtype=dtype))
+            assert result.dtype == np.float32
+            assert (result == 0).all()
+    
+    def test_all_nan_stays_nan(self):
+        """An all-NoData raster stays NoData."""
+        result = main.normalize_array(np.full((2, 2), np.nan, dtype=np.float32))
+        assert np.isnan(result).all()
+
+
+class TestCoveringWindow:
+    """Test the windowed GeoTIFF read extent."""
+    
+    def test_rounds_outward(self):
+        """Partially covered edge pixels are kept on every side."""
+        window = main.covering_window(Window(10.6, 5.7, 20.3, 15.2), 100, 100)
+        assert window == Window(10, 5, 21, 16)  # Columns 10..30, rows 5..20
+    
+    def test_whole_pixels_unchanged(self):
+        """An already pixel-aligned window is returned as is."""
+        assert main.covering_window(Window(3, 4, 5, 6), 100, 100) == Window(3, 4, 5, 6)
+    
+    def test_clamped_to_raster(self):
+        """Windows hanging off the raster are clipped to it."""
+        window = main.covering_window(Window(-2.5, 90.2, 20, 20), 100, 100)
+        assert window == Window(0, 90, 18, 10)
+
+
+class TestGreenDeficitIndex:
+    """Test the fused normalization + GDI kernels."""
+    
+    @pytest.fixture
+    def rasters(self):
+        """NDVI/LST with NoData holes and values outside the clip bounds."""
+        rng = np.random.default_rng(1)
+        ndvi = rng.uniform(-0.6, 1.0, (40, 70)).astype(np.float32)  # Beyond the clip range
+        lst = rng.uniform(15.0, 45.0, (40, 70)).astype(np.float32)
+        ndvi[::5, ::4] = np.nan
+        lst[::6, 1::3] = np.nan
+        return ndvi, lst
+    
+    def test_norms_and_gdi_match_reference(self, rasters, kernel_path):
+        """Both paths agree with the original masked formula, NaN included."""
+        for result, expected in zip(main.compute_norms_and_gdi(*rasters), reference_gdi(*rasters)):
+            assert result.dtype == np.float32
+            np.testing.assert_allclose(result, expected, atol=1e-6)
+    
+    def test_gdi_only_matches_fused(self, rasters, kernel_path):
+        """compute_green_deficit_index equals the GDI of the fused pass."""
+        np.testing.assert_allclose(
+            main.compute_green_deficit_index(*rasters), reference_gdi(*rasters)[2], atol=1e-6
+        )
+    
+    def test_float64_input(self, rasters, kernel_path):
+        """float64 rasters are accepted and give float32 output."""
+        ndvi, lst = (r.astype(np.float64) for r in rasters)
+        gdi = main.compute_green_deficit_index(ndvi, lst)
+        assert gdi.dtype == np.float32
+        np.testing.assert_allclose(gdi, reference_gdi(*rasters)[2], atol=1e-6)
+
+
+class TestSampleRasterAlongRoads:
+    """Test per-segment raster means along roads."""
+    
+    # Pixel (row, col) covers x in [col, col + 1), y in (-row - 1, -row]
+    TRANSFORM = InverseTransform(1.0, 0.0, 0.0, 0.0, -1.0, 0.0)
+    
+    @pytest.fixture
+    def raster(self):
+        """10×10 raster whose value is the column index, with a NoData row."""
+        raster = np.tile(np.arange(10, dtype=np.float32), (10, 1))  # Value = column
+        raster[7, :] = np.nan
+        return raster
+    
+    def sample(self, geometries, raster):
+        """raster_mean of each geometry."""
+        roads = gpd.GeoDataFrame(geometry=geometries, crs="EPSG:4326")
+        return main.sample_raster_along_roads(roads, raster, self.TRANSFORM)["raster_mean"].to_numpy()
+    
+    def test_mean_along_line(self, raster, kernel_path):
+        """Samples are weighted by the length of road inside each pixel."""
+        means = self.sample([
+            LineString([(0.5, -2.5), (4.5, -2.5)]),  # Columns 0..4, half a pixel at each end
+            LineString([(6.5, -0.5), (6.5, -5.5)]),  # Column 6 only
+        ], raster)
+        np.testing.assert_allclose(means, [2.0, 6.0], atol=1e-2)
+    
+    def test_off_raster_nodata_and_empty_are_nan(self, raster, kernel_path):
+        """Segments with no finite in-bounds sample get NaN."""
+        means = self.sample([
+            LineString([(20.0, -2.5), (25.0, -2.5)]),  # East of the raster
+            LineString([(1.5, -7.5), (8.5, -7.5)]),  # Along the NoData row
+            LineString(),
+        ], raster)
+        assert np.isnan(means).all()
+    
+    def test_paths_agree(self, raster, monkeypatch):
+        """The Numba kernel and the NumPy fallback give the same means."""
+        if not main.HAS_NUMBA:
+            pytest.skip("numba not installed")
+        rng = np.random.default_rng(2)
+        lines = [LineString(rng.uniform(-2.0, 12.0, (4, 2)) * [1, -1]) for _ in range(50)]
+        
+        numba_means = self.sample(lines, raster)
+        monkeypatch.setattr(main, "HAS_NUMBA", False)
+        np.testing.assert_allclose(self.sample(lines, raster), numba_means, rtol=1e-6)
+
+
+class TestNanPercentile:
+    """Test the selection-based percentile."""
+    
+    def test_matches_nanpercentile(self):
+        """Linear-interpolated percentiles equal np.nanpercentile."""
+        rng = np.random.default_rng(3)
+        arr = rng.normal(0.5, 0.2, (123, 45)).astype(np.float32)
+        arr[rng.random(arr.shape) < 0.3] = np.nan
+        for q in (0, 10, 50, 85, 99.5, 100):
+            assert main.nan_percentile(arr, q) == pytest.approx(np.nanpercentile(arr, q), rel=1e-6)
+    
+    def test_single_value(self):
+        """One finite value is every percentile."""
+        assert main.nan_percentile(np.array([np.nan, 4.0, np.nan]), 85) == 4.0
+    
+    def test_all_nan(self):
+        """No finite values gives NaN."""
+        assert np.isnan(main.nan_percentile(np.full(5, np.nan), 50))
+
+
+class TestColormapToRgba:
+    """Test LUT colouring against Matplotlib's own colormap lookup."""
+    
+    @pytest.mark.parametrize("cmap_name", ["priority", "RdYlGn", "Greys"])
+    @pytest.mark.parametrize("vmin, vmax", [(0.0, 1.0), (22.0, 32.0)])
+    def test_matches_matplotlib(self, cmap_name, vmin, vmax):
+        """Bins, under/over clamping and transparent NaN match cmap(norm(values))."""
+        import matplotlib
+        from matplotlib.colors import Normalize
+        
+        # Bin centres (clear of float32 rounding at the edges), out of range, NaN
+        centres = (np.arange(256) + 0.5) / 256
+        values = np.concatenate([centres, [-0.5, 1.5, np.nan]]) * (vmax - vmin) + vmin
+        values = values.astype(np.float32).reshape(7, 37)
+        
+        cmap = main.get_priority_cmap() if cmap_name == "priority" else matplotlib.colormaps[cmap_name]
+        expected = cmap(Normalize(vmin=vmin, vmax=vmax)(values), bytes=True)
+        expected[np.isnan(values)] = 0
+        
+        rgba = main.colormap_to_rgba(values, cmap_name, vmin, vmax)
+        assert rgba.dtype == np.uint8 and rgba.shape == (7, 37, 4)
+        np.testing.assert_array_equal(rgba, expected)
+    
+    def test_flat_range_uses_first_bin(self):
+        """vmin == vmax colours finite values with the first bin, NaN stays transparent."""
+        rgba = main.colormap_to_rgba(np.array([[3.0, np.nan]]), "Greys", 3.0, 3.0)
+        assert rgba[0, 0].tolist() == main._colormap_lut("Greys")[0].tolist()
+        assert rgba[0, 1].tolist() == [0, 0, 0, 0]
+
+
+class TestRoadsCache:
+    """Test sampled-roads cache expiry."""
+    
+    @pytest.fixture
+    def cache_file(self, tmp_path, monkeypatch):
+        for name in ("NDVI_PATH", "LST_PATH"):
+            raster = tmp_path / f"{name}.tif"
+            raster.write_bytes(b"")
+            os.utime(raster, (1000, 1000))
+            monkeypatch.setattr(main, name, str(raster))
+        path = tmp_path / "roads.gpkg"
+        path.write_bytes(b"")
+        return str(path)
+    
+    def test_fresh_cache_is_reused(self, cache_file):
+        assert main.roads_cache_valid(cache_file)
+        assert not main.roads_cache_valid(cache_file, refresh=True)
+    
+    def test_expired_cache_is_refetched(self, cache_file):
+        age = (main.ROADS_CACHE_MAX_AGE_DAYS + 1) * 86400
+        os.utime(cache_file, (time.time() - age,) * 2)
+        assert not main.roads_cache_valid(cache_file)
+    
+    def test_cache_older_than_inputs_is_refetched(self, cache_file):
+        os.utime(main.NDVI_PATH, None)
+        os.utime(cache_file, (time.time() - 60,) * 2)
+        assert not main.roads_cache_valid(cache_file)
+    
+    def test_missing_cache(self, tmp_path):
+        assert not main.roads_cache_valid(str(tmp_path / "none.gpkg"))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])